@@ -0,0 +1,6 @@
+"""
+Shared helpers for the HIV descriptive-analysis charts.
+
+The chart scripts in the repository root import from this package so the
+UNAIDS workbook is parsed once and reused across every figure.
+"""
@@ -0,0 +1,287 @@
+"""
+Command line entry point: python -m hiv_charts <command> [options]
+
+    render-all   Load the workbook once and render every chart variant.
+    export-maps  Export the yearly world maps through one warm kaleido session.
+    animate-map  Write one HTML world map with a year slider.
+    serve        Serve every chart over HTTP from a resident dataset.
+    benchmark    Time the load, transform and render stages of every chart.
+    diff         Compare two workbook releases cell by cell.
+    query        Run DuckDB SQL against the area (regional) sheet.
+"""
+# ============================================================================
+# LIBRARY IMPORTS
+# ============================================================================
+import argparse
+import sys
+
+import matplotlib
+
+from hiv_charts.cache import WORKBOOK_PATH
+from hiv_charts.profiles import OUTPUT_PROFILES
+from hiv_charts.data import LATIN_AMERICA
+from hiv_charts.export import DEFAULT_WRITER_THREADS
+
+
+# ============================================================================
+# COMMAND: RENDER-ALL
+# ============================================================================
+def cmd_render_all(args):
+    # Batch runs never open windows
+    matplotlib.use('Agg')
+
+    from hiv_charts.batch import RENDERERS, plan_jobs, render_all
+    from hiv_charts.data import load_yearly_data
+    from hiv_charts.export import S3Uploader
+
+    uploader = S3Uploader(args.upload, endpoint_url=args.s3_endpoint) if args.upload else None
+    chart_names = args.charts or list(RENDERERS)
+    df_years = load_yearly_data(args.workbook)
+    try:
+        jobs = plan_jobs(years=args.years, countries=args.countries, chart_names=chart_names,
+                         top_n=args.top_n)
+        report = render_all(df_years, jobs, output_dir=args.output_dir,
+                            workers=args.workers, incremental=args.incremental, profile=args.profile,
+                            writer_threads=args.writer_threads, uploader=uploader)
+    except ValueError as exc:
+        return _error('render-all', exc)
+
+    print(f"{report.rendered} charts rendered ({report.skipped} unchanged, skipped), "
+          f"{len(report.written)} files written to {args.output_dir}")
+    return 0
+
+
+# ============================================================================
+# COMMAND: EXPORT-MAPS
+# ============================================================================
+def cmd_export_maps(args):
+    from hiv_charts.data import load_yearly_data
+    from hiv_charts.export import S3Uploader
+    from hiv_charts.mapexport import export_world_maps
+
+    uploader = S3Uploader(args.upload, endpoint_url=args.s3_endpoint) if args.upload else None
+    try:
+        df_years = load_yearly_data(args.workbook, indicators=[args.indicator])
+        years = args.years or _map_years(df_years, args.indicator)
+        _check_map_years(df_years, args.indicator, years)
+        written = export_world_maps(df_years, years, indicator_column=args.indicator,
+                                    output_dir=args.output_dir, html=not args.no_html,
+                                    profile=args.profile, writer_threads=args.writer_threads,
+                                    uploader=uploader)
+    except (KeyError, ValueError, RuntimeError) as exc:
+        return _error('export-maps', exc)
+
+    print(f"{len(years)} maps exported, {len(written)} files written to {args.output_dir}")
+    return 0
+
+
+# ============================================================================
+# COMMAND: ANIMATE-MAP
+# ============================================================================
+def cmd_animate_map(args):
+    from hiv_charts.data import load_yearly_data
+    from hiv_charts.mapexport import export_world_map_animation
+
+    include_plotlyjs = {'embed': True, 'directory': 'directory', 'cdn': 'cdn'}[args.plotlyjs]
+    try:
+        df_years = load_yearly_data(args.workbook, indicators=[args.indicator])
+        if args.years:
+            _check_map_years(df_years, args.indicator, args.years)
+        html_path = export_world_map_animation(df_years, args.years, indicator_column=args.indicator,
+                                               output_dir=args.output_dir,
+                                               include_plotlyjs=include_plotlyjs)
+    except (KeyError, ValueError) as exc:
+        return _error('animate-map', exc)
+
+    print(f"Multi-year map written to {html_path}")
+    return 0
+
+
+# ============================================================================
+# COMMAND: SERVE
+# ============================================================================
+def cmd_serve(args):
+    from hiv_charts.server import serve
+
+    serve(args.workbook, host=args.host, port=args.port, workers=args.workers or None,
+          cache_size=args.cache_size)
+    return 0
+
+
+# ============================================================================
+# COMMAND: BENCHMARK
+# ============================================================================
+def cmd_benchmark(args):
+    matplotlib.use('Agg')
+
+    from hiv_charts.benchmark import format_report, run_benchmarks
+
+    report = run_benchmarks(args.workbook, scales=args.scales, repeat=args.repeat,
+                            select=args.select, output=args.output)
+    print(format_report(report))
+    if args.output:
+        print(f"Results written to {args.output}")
+    return 0
+
+
+# ============================================================================
+# COMMAND: DIFF
+# ============================================================================
+def cmd_diff(args):
+    from hiv_charts.diff import diff_releases, format_diff
+
+    diff = diff_releases(args.old, args.new, indicators=args.indicators, countries=args.countries,
+                         tolerance=args.tolerance)
+    print(format_diff(diff, top=args.top))
+    if args.output:
+        diff.changes.to_csv(args.output, index=False)
+        print(f"{len(diff.changes)} changed cells written to {args.output}")
+    return 0
+
+
+# ============================================================================
+# COMMAND: QUERY
+# ============================================================================
+def cmd_query(args):
+    from hiv_charts.area import query_area
+
+    try:
+        result = query_area(args.sql, args.workbook)
+    except (ValueError, RuntimeError) as exc:
+        return _error('query', exc)
+    if args.output:
+        result.to_csv(args.output, index=False)
+        print(f"{len(result)} rows written to {args.output}")
+    else:
+        print(result.to_string(index=False))
+    return 0
+
+
+# ============================================================================
+# INTERNAL HELPERS
+# ============================================================================
+def _error(command, exc):
+    # KeyError quotes its message; print the text itself
+    message = exc.args[0] if isinstance(exc, KeyError) and exc.args else exc
+    print(f"{command}: error: {message}", file=sys.stderr)
+    return 2
+
+
+def _map_years(df_years, indicator):
+    return sorted(int(y) for y in df_years.loc[df_years[indicator].notna(), 'Years'].unique())
+
+
+def _check_map_years(df_years, indicator, years):
+    # Years without a single value of the indicator would only give empty maps
+    from hiv_charts.batch import check_jobs
+    check_jobs(df_years[df_years[indicator].notna()],
+               [('world-map', {'target_year': year}) for year in years])
+
+
+# ============================================================================
+# ARGUMENT PARSING
+# ============================================================================
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m hiv_charts')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    render = subparsers.add_parser('render-all', help='render every chart from one loaded dataset')
+    render.add_argument('--workbook', default=WORKBOOK_PATH, help='UNAIDS estimates workbook')
+    render.add_argument('--years', type=int, nargs='+', default=[2024],
+                        help='target years for the yearly charts (default: 2024)')
+    render.add_argument('--countries', nargs='+', default=LATIN_AMERICA,
+                        help='countries for per-country and regional charts (default: Latin America)')
+    render.add_argument('--charts', nargs='+', metavar='CHART',
+                        help='subset of charts to render (default: all)')
+    render.add_argument('--top-n', type=int,
+                        help='stacked-area chart: keep the N largest countries, group the rest')
+    render.add_argument('--output-dir', default='.', help='directory for the generated files')
+    render.add_argument('--workers', type=int, default=1,
+                        help='worker processes; 0 uses every core (default: 1, no pool)')
+    render.add_argument('--incremental', action='store_true',
+                        help='skip charts whose data slice and parameters did not change')
+    render.add_argument('--profile', choices=list(OUTPUT_PROFILES), default='print',
+                        help='output profile: 300-dpi PNG (print, default), 96-dpi PNG/WebP '
+                             '(web, webp) or vector (svg, pdf)')
+    render.add_argument('--writer-threads', type=int, default=DEFAULT_WRITER_THREADS,
+                        help=f'threads writing files while rendering goes on (default: {DEFAULT_WRITER_THREADS})')
+    render.add_argument('--upload', metavar='S3_URL',
+                        help='also upload every file to s3://bucket/prefix (requires boto3)')
+    render.add_argument('--s3-endpoint', metavar='URL',
+                        help='S3-compatible endpoint for --upload, e.g. http://localhost:9000 for MinIO')
+    render.set_defaults(func=cmd_render_all)
+
+    maps = subparsers.add_parser('export-maps', help='export yearly world maps in one kaleido session')
+    maps.add_argument('--workbook', default=WORKBOOK_PATH, help='UNAIDS estimates workbook')
+    maps.add_argument('--years', type=int, nargs='+', help='years to export (default: every year)')
+    maps.add_argument('--indicator', default='know_status_all_ages', help='indicator column to map')
+    maps.add_argument('--no-html', action='store_true', help='only write the image files')
+    maps.add_argument('--profile', choices=list(OUTPUT_PROFILES), default='print',
+                      help='image format and scale of the maps')
+    maps.add_argument('--output-dir', default='.', help='directory for the generated files')
+    maps.add_argument('--writer-threads', type=int, default=DEFAULT_WRITER_THREADS,
+                      help=f'threads writing files while rendering goes on (default: {DEFAULT_WRITER_THREADS})')
+    maps.add_argument('--upload', metavar='S3_URL',
+                      help='also upload every file to s3://bucket/prefix (requires boto3)')
+    maps.add_argument('--s3-endpoint', metavar='URL',
+                      help='S3-compatible endpoint for --upload, e.g. http://localhost:9000 for MinIO')
+    maps.set_defaults(func=cmd_export_maps)
+
+    animate = subparsers.add_parser('animate-map', help='write one world map HTML with a year slider')
+    animate.add_argument('--workbook', default=WORKBOOK_PATH, help='UNAIDS estimates workbook')
+    animate.add_argument('--years', type=int, nargs='+', help='years to include (default: every year)')
+    animate.add_argument('--indicator', default='know_status_all_ages', help='indicator column to map')
+    animate.add_argument('--plotlyjs', choices=['embed', 'directory', 'cdn'], default='embed',
+                         help='embed plotly.js once (default), share plotly.min.js in the '
+                              'output directory, or load it from the CDN')
+    animate.add_argument('--output-dir', default='.', help='directory for the generated files')
+    animate.set_defaults(func=cmd_animate_map)
+
+    server = subparsers.add_parser('serve', help='serve charts over HTTP from a resident dataset')
+    server.add_argument('--workbook', default=WORKBOOK_PATH, help='UNAIDS estimates workbook')
+    server.add_argument('--host', default='127.0.0.1', help='address to listen on')
+    server.add_argument('--port', type=int, default=8050, help='port to listen on')
+    server.add_argument('--workers', type=int, default=0,
+                        help='render processes (default: all cores)')
+    server.add_argument('--cache-size', type=int, default=128,
+                        help='rendered figures kept in memory')
+    server.set_defaults(func=cmd_serve)
+
+    bench = subparsers.add_parser('benchmark', help='time every load, transform and render stage')
+    bench.add_argument('--workbook', default=WORKBOOK_PATH, help='UNAIDS estimates workbook')
+    bench.add_argument('--scales', type=int, nargs='+', default=[1],
+                       help='country multipliers for synthetic datasets (e.g. 1 10 100)')
+    bench.add_argument('--repeat', type=int, default=3, help='timed runs per benchmark')
+    bench.add_argument('--select', nargs='+',
+                       help='only benchmarks whose name or chart contains one of these')
+    bench.add_argument('--output', help='JSON file for timings and peak memory')
+    bench.set_defaults(func=cmd_benchmark)
+
+    diff = subparsers.add_parser('diff', help='compare two workbook releases cell by cell')
+    diff.add_argument('old', help='earlier release workbook')
+    diff.add_argument('new', help='later release workbook')
+    diff.add_argument('--indicators', nargs='+', help='indicator columns to compare (default: all)')
+    diff.add_argument('--countries', nargs='+', help='countries to compare (default: all)')
+    diff.add_argument('--tolerance', type=float, default=1e-6,
+                      help='relative change ignored as unchanged (default: 1e-6)')
+    diff.add_argument('--top', type=int, default=20, help='largest revisions to list')
+    diff.add_argument('--output', help='CSV file for every changed cell')
+    diff.set_defaults(func=cmd_diff)
+
+    query = subparsers.add_parser('query', help="run SQL against the area sheet (table 'area'; requires duckdb)")
+    query.add_argument('sql', help="e.g. \"SELECT Region, sum(on_art_all_ages) FROM area "
+                                   "WHERE NOT Aggregate AND Years = 2024 GROUP BY Region\"")
+    query.add_argument('--workbook', default=WORKBOOK_PATH, help='UNAIDS estimates workbook')
+    query.add_argument('--output', help='CSV file for the result (default: print it)')
+    query.set_defaults(func=cmd_query)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
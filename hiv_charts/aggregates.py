@@ -0,0 +1,285 @@
+# ============================================================================
+# LIBRARY IMPORTS
+# ============================================================================
+import hashlib
+import json
+import os
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from hiv_charts.cache import WORKBOOK_PATH, cache_dir_for
+from hiv_charts.data import LATIN_AMERICA, SUBSET_ATTR, WORKBOOK_ATTR
+from hiv_charts.reshape import pivot_indicators
+from hiv_charts.trace import traced
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Bump when the aggregates or their on-disk layout change
+AGGREGATES_VERSION = 1
+
+# Aggregate sets kept in memory (least recently used are evicted first)
+AGGREGATE_LRU_SIZE = 8
+
+# Regions summed from their member countries; only count indicators are
+# summed, percentages are left as NaN
+COMPUTED_REGIONS = {'LAC': LATIN_AMERICA}
+
+# Aggregate rows already published in the sheet: the UNAIDS regions (codes
+# starting with 'UNA') and the global total
+UNAIDS_REGION_PREFIX = 'UNA'
+GLOBAL_COUNTRY = 'Global'
+
+# Columns behind the treatment gap (need minus effective regimen)
+GAP_COLUMNS = ('pmtct_need', 'pmtct_effective_regimen')
+
+_version_cache = {}
+_aggregates_lru = OrderedDict()
+
+
+# ============================================================================
+# CLASS: INDICATOR AGGREGATES
+# ============================================================================
+class IndicatorAggregates:
+    """
+    Derived quantities shared by the charts, computed once per dataset
+    version for every country and region:
+
+        series        (year, country, indicator) values of every country
+        region_values (year, region, indicator) regional rollups
+        gap           (year, country) pmtct_need - pmtct_effective_regimen
+        mean, std     (country, indicator) over the available years (std
+                      is the population standard deviation)
+        count         (country, indicator) number of available years
+    """
+
+    def __init__(self, version, years, countries, indicators, regions,
+                 series, region_values, gap, mean, std, count):
+        self.version = version
+        self.years = np.asarray(years)
+        self.countries = list(countries)
+        self.indicators = list(indicators)
+        self.regions = list(regions)
+        self.series = series
+        self.region_values = region_values
+        self.gap = gap
+        self.mean = mean
+        self.std = std
+        self.count = count
+
+        self._country_pos = {country: i for i, country in enumerate(self.countries)}
+        self._region_pos = {region: i for i, region in enumerate(self.regions)}
+        self._indicator_pos = {name: k for k, name in enumerate(self.indicators)}
+
+    # ------------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------------
+    @classmethod
+    @traced('reshape.aggregates')
+    def compute(cls, df_years, version=None):
+        """
+        Computes every aggregate from the long yearly DataFrame.
+        """
+        cube = pivot_indicators(df_years)
+        countries = [str(c) for c in cube.countries]
+        values = cube.values
+        indicators = cube.indicators
+
+        # Regions computed from member countries
+        is_count = np.array(['_pct' not in name for name in indicators])
+        country_pos = pd.Index(countries)
+        rollups, regions = [], []
+        for region, members in COMPUTED_REGIONS.items():
+            member_pos = country_pos.get_indexer([m for m in members if m in country_pos])
+            rollups.append(np.where(is_count, _nansum(values[:, member_pos], axis=1), np.nan))
+            regions.append(region)
+
+        # Regions published as aggregate rows
+        codes = (
+            df_years[['Country', 'Code']].astype(str).drop_duplicates('Country')
+            .set_index('Country')['Code'].reindex(countries).fillna('')
+        )
+        published = [
+            country for country, code in zip(countries, codes)
+            if code.startswith(UNAIDS_REGION_PREFIX) or country == GLOBAL_COUNTRY
+        ]
+        rollups.extend(values[:, country_pos.get_loc(country)] for country in published)
+        regions.extend(published)
+
+        region_values = np.stack(rollups, axis=1) if rollups else np.empty(values.shape[:1] + (0, len(indicators)))
+
+        if all(column in indicators for column in GAP_COLUMNS):
+            need, effective = (values[:, :, indicators.index(column)] for column in GAP_COLUMNS)
+            gap = need - effective
+        else:
+            gap = np.full(values.shape[:2], np.nan)
+
+        # Per-country statistics over the years
+        available = ~np.isnan(values)
+        count = available.sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(available, values, 0).sum(axis=0) / count
+            deviations = np.where(available, values - mean, 0)
+            std = np.sqrt((deviations ** 2).sum(axis=0) / count)
+
+        if version is None:
+            version = dataset_version(df_years)
+        return cls(version, cube.years, countries, indicators, regions,
+                   values, region_values, gap, mean, std, count)
+
+    # ------------------------------------------------------------------------
+    # Selections
+    # ------------------------------------------------------------------------
+    def country(self, name, indicators=None):
+        """
+        Returns the yearly series of one country as a DataFrame indexed by year.
+        """
+        return self._frame(self.series[:, self._country_pos[name]], indicators)
+
+    def region(self, name, indicators=None):
+        """
+        Returns the yearly rollup of one region as a DataFrame indexed by year.
+        """
+        return self._frame(self.region_values[:, self._region_pos[name]], indicators)
+
+    def country_gap(self, name):
+        """
+        Returns the treatment gap of one country as a Series indexed by year.
+        """
+        return pd.Series(self.gap[:, self._country_pos[name]],
+                         index=pd.Index(self.years, name='Years'), name='gap')
+
+    def stats(self, name, indicators):
+        """
+        Returns (mean, std, count) arrays of one country for some indicators.
+        """
+        i = self._country_pos[name]
+        k = [self._indicator_pos[indicator] for indicator in indicators]
+        return self.mean[i, k], self.std[i, k], self.count[i, k]
+
+    def _frame(self, block, indicators):
+        frame = pd.DataFrame(block, index=pd.Index(self.years, name='Years'), columns=self.indicators)
+        return frame if indicators is None else frame[list(indicators)]
+
+    # ------------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------------
+    def save(self, path):
+        """
+        Writes the aggregates to an uncompressed .npz file, atomically.
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Unique per process and thread: pool workers save the same version at once
+        tmp_path = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as fh:
+            np.savez(
+                fh,
+                labels=np.array(json.dumps({
+                    'version': self.version,
+                    'countries': self.countries,
+                    'indicators': self.indicators,
+                    'regions': self.regions,
+                })),
+                years=self.years,
+                series=self.series,
+                region_values=self.region_values,
+                gap=self.gap,
+                mean=self.mean,
+                std=self.std,
+                count=self.count,
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            labels = json.loads(str(data['labels']))
+            return cls(labels['version'], data['years'], labels['countries'],
+                       labels['indicators'], labels['regions'], data['series'],
+                       data['region_values'], data['gap'], data['mean'],
+                       data['std'], data['count'])
+
+
+# ============================================================================
+# FUNCTION: DATASET VERSION
+# ============================================================================
+def dataset_version(df_years):
+    """
+    Returns the content hash of a yearly DataFrame (columns and values),
+    computed once per DataFrame. Datasets are treated as immutable.
+    """
+    key = id(df_years)
+    entry = _version_cache.get(key)
+    if entry is not None and entry[0]() is df_years:
+        return entry[1]
+
+    digest = hashlib.sha256()
+    digest.update(json.dumps([str(c) for c in df_years.columns]).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df_years, index=False).to_numpy().tobytes())
+    version = digest.hexdigest()
+
+    _version_cache[key] = (weakref.ref(df_years), version)
+    weakref.finalize(df_years, _version_cache.pop, key, None)
+    return version
+
+
+# ============================================================================
+# FUNCTION: MATERIALIZED AGGREGATES
+# ============================================================================
+def get_aggregates(df_years, file_path=None):
+    """
+    Returns the IndicatorAggregates of a dataset.
+
+    Lookups go through an in-memory LRU, then the .npz file stored in the
+    workbook's cache directory, and only compute the aggregates when
+    neither has this dataset version. file_path defaults to the workbook
+    the dataset was loaded from (see load_yearly_data). Aggregates of
+    loads restricted to some countries or years are not written to disk.
+    """
+    if file_path is None:
+        file_path = df_years.attrs.get(WORKBOOK_ATTR, WORKBOOK_PATH)
+    version = dataset_version(df_years)
+    aggregates = _aggregates_lru.get(version)
+    if aggregates is not None:
+        _aggregates_lru.move_to_end(version)
+        return aggregates
+
+    if df_years.attrs.get(SUBSET_ATTR):
+        aggregates = IndicatorAggregates.compute(df_years, version)
+    else:
+        path = aggregates_path(file_path, version)
+        try:
+            aggregates = IndicatorAggregates.load(path)
+        except (OSError, ValueError, KeyError):
+            aggregates = IndicatorAggregates.compute(df_years, version)
+            aggregates.save(path)
+
+    _aggregates_lru[version] = aggregates
+    while len(_aggregates_lru) > AGGREGATE_LRU_SIZE:
+        _aggregates_lru.popitem(last=False)
+    return aggregates
+
+
+def aggregates_path(file_path, version):
+    """
+    Returns the aggregates file of one dataset version, next to the sheet cache.
+    """
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    name = f"{stem}.aggregates.{version[:16]}.v{AGGREGATES_VERSION}.npz"
+    return os.path.join(cache_dir_for(file_path), name)
+
+
+# ============================================================================
+# INTERNAL HELPERS
+# ============================================================================
+def _nansum(values, axis):
+    """
+    Sums ignoring NaN, but returns NaN where every value is missing.
+    """
+    total = np.nansum(values, axis=axis)
+    return np.where(np.isnan(values).all(axis=axis), np.nan, total)
@@ -0,0 +1,225 @@
+# ============================================================================
+# LIBRARY IMPORTS
+# ============================================================================
+import os
+import threading
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.dataset as pads
+
+from hiv_charts.aggregates import GLOBAL_COUNTRY, UNAIDS_REGION_PREFIX
+from hiv_charts.cache import WORKBOOK_PATH, cache_dir_for, workbook_version
+from hiv_charts.dataset import parse_cells
+from hiv_charts.schema import ID_HEADERS, resolve_catalog
+from hiv_charts.stream import iter_row_batches
+from hiv_charts.trace import stage
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Test & Treat sheet ordered by area: every UNAIDS region row is followed by
+# the rows of its member countries
+AREA_SHEET = 2
+
+# Bump when the columns of the typed area table change
+AREA_TABLE_VERSION = 1
+
+# Columns added to the sheet's own: the UNAIDS region of each row ('Global'
+# for the global total) and whether the row is an aggregate (a region or
+# the global total) rather than a country
+REGION_COLUMN = 'Region'
+AGGREGATE_COLUMN = 'Aggregate'
+
+# Query engines, in the order engine='auto' tries them; DuckDB and Polars
+# are optional, pyarrow is always available through the sheet cache
+ENGINES = ('duckdb', 'polars', 'pyarrow')
+
+# Name of the area table in query_area() SQL
+AREA_TABLE = 'area'
+
+
+# ============================================================================
+# FUNCTION: TYPED AREA TABLE
+# ============================================================================
+def area_table_path(file_path=WORKBOOK_PATH):
+    """
+    Returns the typed Arrow file of the area sheet, building it on first use.
+
+    The sheet is streamed from the workbook in row batches, each batch
+    parsed (float32 indicators with catalog names, int16 Years) and
+    appended to the file, so the whole sheet is never held in memory. The
+    file lives in the workbook's cache directory and is keyed on its
+    content hash, like the sheet cache.
+    """
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    name = f"{stem}.area.{workbook_version(file_path)[:16]}.v{AREA_TABLE_VERSION}.arrow"
+    path = os.path.join(cache_dir_for(file_path), name)
+    if not os.path.exists(path):
+        with stage('load.area', sheet=AREA_SHEET):
+            _write_area_table(file_path, path)
+    return path
+
+
+def _write_area_table(file_path, path):
+    catalog = resolve_catalog(file_path, AREA_SHEET)
+    positions = list(range(len(ID_HEADERS))) + [ind.position for ind in catalog]
+    names = ID_HEADERS + catalog.names()
+    schema = pa.schema(
+        [('Years', pa.int16()), ('Code', pa.string()), ('Country', pa.string()),
+         (REGION_COLUMN, pa.string()), (AGGREGATE_COLUMN, pa.bool_())]
+        + [(name, pa.float32()) for name in catalog.names()]
+    )
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Unique per process and thread: concurrent builds of the table never clash
+    tmp_path = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    region = None
+    # Uncompressed so scans can memory-map the file
+    with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, schema) as writer:
+        for batch in iter_row_batches(file_path, AREA_SHEET, positions=positions, names=names,
+                                      header_rows=catalog.header_rows):
+            typed, region = _type_batch(batch, catalog.names(), schema, region)
+            writer.write_batch(typed)
+    os.replace(tmp_path, path)
+
+
+def _type_batch(batch, indicators, schema, region):
+    """
+    Parses one streamed batch; region is the region of the last row of the
+    previous batch, carried over to the member rows that open this one.
+    """
+    codes = np.asarray(batch.column('Code').to_pylist(), dtype=object)
+    countries = np.asarray(batch.column('Country').to_pylist(), dtype=object)
+
+    aggregate = np.array([str(code).startswith(UNAIDS_REGION_PREFIX) for code in codes])
+    aggregate |= countries == GLOBAL_COUNTRY
+    regions = np.empty(len(countries), dtype=object)
+    for i, country in enumerate(countries):
+        if aggregate[i]:
+            region = country
+        regions[i] = region
+
+    values, _ = parse_cells(batch.select(indicators).to_pandas())
+    # Missing cells become nulls, which SQL aggregates and Polars skip
+    arrays = [
+        pa.array(batch.column('Years').to_numpy(zero_copy_only=False), type=pa.int16()),
+        pa.array(codes, type=pa.string()),
+        pa.array(countries, type=pa.string()),
+        pa.array(regions, type=pa.string()),
+        pa.array(aggregate),
+    ] + [pa.array(values[:, k], from_pandas=True) for k in range(len(indicators))]
+    return pa.RecordBatch.from_arrays(arrays, schema=schema), region
+
+
+# ============================================================================
+# FUNCTION: LAZY SCANS
+# ============================================================================
+def scan_area(file_path=WORKBOOK_PATH, engine='auto'):
+    """
+    Returns a lazy scan of the area table: a DuckDB relation, a Polars
+    LazyFrame or a pyarrow Dataset. Nothing is read until the scan is
+    collected, and then only the selected columns and matching rows.
+    """
+    path = area_table_path(file_path)
+    engine = _resolve_engine(engine)
+    if engine == 'duckdb':
+        return _import_engine('duckdb').from_arrow(pads.dataset(path, format='arrow'))
+    if engine == 'polars':
+        return _import_engine('polars').scan_ipc(path)
+    return pads.dataset(path, format='arrow')
+
+
+def query_area(sql, file_path=WORKBOOK_PATH):
+    """
+    Runs a DuckDB SQL query against the area table (named 'area') and
+    returns the result as a DataFrame, e.g.
+
+        query_area("SELECT Region, sum(on_art_all_ages) FROM area "
+                   "WHERE NOT Aggregate AND Years = 2024 GROUP BY Region")
+
+    Requires duckdb.
+    """
+    duckdb = _import_engine('duckdb')
+    connection = duckdb.connect()
+    try:
+        connection.register(AREA_TABLE, pads.dataset(area_table_path(file_path), format='arrow'))
+        with stage('query.area', engine='duckdb') as st:
+            return st.record(connection.execute(sql).df())
+    finally:
+        connection.close()
+
+
+# ============================================================================
+# FUNCTION: REGIONAL SERIES
+# ============================================================================
+def region_series(indicator, regions=None, years=None, file_path=WORKBOOK_PATH, engine='auto'):
+    """
+    Returns the (Region, Years, value) rows of the published region and
+    global aggregates for one indicator, sorted by region and year.
+
+    Only the four columns involved are read from the area table, with the
+    region and year filters pushed down to the scan.
+    """
+    path = area_table_path(file_path)
+    columns = pads.dataset(path, format='arrow').schema.names
+    if indicator not in columns or indicator in ID_HEADERS + [REGION_COLUMN, AGGREGATE_COLUMN]:
+        raise KeyError(f"Unknown indicator column '{indicator}'")
+    engine = _resolve_engine(engine)
+    years = None if years is None else [int(y) for y in years]
+
+    with stage('query.region_series', engine=engine, indicator=indicator) as st:
+        if engine == 'duckdb':
+            duckdb = _import_engine('duckdb')
+            relation = duckdb.from_arrow(pads.dataset(path, format='arrow')).filter(AGGREGATE_COLUMN)
+            if regions is not None:
+                relation = relation.filter(duckdb.ColumnExpression(REGION_COLUMN).isin(
+                    *[duckdb.ConstantExpression(r) for r in regions]))
+            if years is not None:
+                relation = relation.filter(duckdb.ColumnExpression('Years').isin(
+                    *[duckdb.ConstantExpression(y) for y in years]))
+            frame = relation.select(REGION_COLUMN, 'Years', indicator).df()
+        elif engine == 'polars':
+            pl = _import_engine('polars')
+            scan = pl.scan_ipc(path).filter(pl.col(AGGREGATE_COLUMN))
+            if regions is not None:
+                scan = scan.filter(pl.col(REGION_COLUMN).is_in(list(regions)))
+            if years is not None:
+                scan = scan.filter(pl.col('Years').is_in(years))
+            frame = scan.select(REGION_COLUMN, 'Years', indicator).collect().to_pandas()
+        else:
+            predicate = pads.field(AGGREGATE_COLUMN)
+            if regions is not None:
+                predicate &= pads.field(REGION_COLUMN).isin(list(regions))
+            if years is not None:
+                predicate &= pads.field('Years').isin(years)
+            frame = pads.dataset(path, format='arrow').to_table(
+                columns=[REGION_COLUMN, 'Years', indicator], filter=predicate).to_pandas()
+        frame = frame.rename(columns={indicator: 'value'})
+        frame = frame.sort_values([REGION_COLUMN, 'Years'], kind='stable').reset_index(drop=True)
+        return st.record(frame)
+
+
+# ============================================================================
+# INTERNAL HELPERS
+# ============================================================================
+def _resolve_engine(engine):
+    if engine != 'auto':
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}'. Choose from: auto, {', '.join(ENGINES)}")
+        return engine
+    for candidate in ENGINES[:-1]:
+        try:
+            __import__(candidate)
+        except ImportError:
+            continue
+        return candidate
+    return 'pyarrow'
+
+
+def _import_engine(name):
+    try:
+        return __import__(name)
+    except ImportError:
+        raise RuntimeError(f"This query requires {name} (pip install {name})") from None
@@ -0,0 +1,169 @@
+# ============================================================================
+# LIBRARY IMPORTS
+# ============================================================================
+import os
+from collections import namedtuple
+
+from hiv_charts import charts
+from hiv_charts.data import LATIN_AMERICA
+from hiv_charts.export import DEFAULT_WRITER_THREADS, export_writer
+from hiv_charts.index import get_country_index
+from hiv_charts.manifest import BuildManifest, fingerprint, job_key
+
+# ============================================================================
+# CHART REGISTRY
+# ============================================================================
+
+# Chart name -> (renderer, parameters it is expanded over)
+RENDERERS = {
+    'world-map': (charts.render_world_map, ('year',)),
+    'sex-bar': (charts.render_sex_bar_chart, ('year', 'countries')),
+    'heatmap': (charts.render_heatmap, ('country',)),
+    'gap': (charts.render_gap_chart, ('country',)),
+    'stacked-area': (charts.render_stacked_area, ('countries',)),
+}
+
+# Chart name -> function returning the data slice the renderer reads
+INPUTS = {
+    'world-map': charts.world_map_inputs,
+    'sex-bar': charts.sex_bar_chart_inputs,
+    'heatmap': charts.heatmap_inputs,
+    'gap': charts.gap_chart_inputs,
+    'stacked-area': charts.stacked_area_inputs,
+}
+
+# Outcome of render_all
+RenderReport = namedtuple('RenderReport', ['written', 'rendered', 'skipped'])
+
+
+# ============================================================================
+# FUNCTION: PLAN RENDER JOBS
+# ============================================================================
+def plan_jobs(years=(2024,), countries=LATIN_AMERICA, chart_names=tuple(RENDERERS), top_n=None):
+    """
+    Expands the requested years and countries into a list of render jobs.
+
+    Each job is a (chart_name, kwargs) tuple: yearly charts get one job per
+    year, per-country charts one job per country, and charts that compare
+    countries receive the whole country list. top_n is forwarded to the
+    stacked-area chart.
+    """
+    jobs = []
+    for name in chart_names:
+        if name not in RENDERERS:
+            raise ValueError(f"Unknown chart '{name}'. Choose from: {', '.join(RENDERERS)}")
+        _, params = RENDERERS[name]
+
+        if 'year' in params:
+            for year in years:
+                kwargs = {'target_year': year}
+                if 'countries' in params:
+                    kwargs['countries'] = list(countries)
+                jobs.append((name, kwargs))
+        elif 'country' in params:
+            for country in countries:
+                jobs.append((name, {'country': country}))
+        else:
+            kwargs = {'countries': list(countries)}
+            if name == 'stacked-area' and top_n is not None:
+                kwargs['top_n'] = top_n
+            jobs.append((name, kwargs))
+    return jobs
+
+
+def check_jobs(df_years, jobs):
+    """
+    Raises ValueError naming every country or year the jobs ask for that
+    the dataset does not have, before anything is rendered.
+    """
+    index = get_country_index(df_years)
+    available_years = {int(year) for year in df_years['Years'].unique()}
+    countries, years = set(), set()
+    for _, kwargs in jobs:
+        countries.update([kwargs['country']] if 'country' in kwargs else kwargs.get('countries', []))
+        if 'target_year' in kwargs:
+            years.add(kwargs['target_year'])
+
+    problems = []
+    unknown = sorted(country for country in countries if country not in index)
+    if unknown:
+        problems.append(f"unknown countries: {', '.join(unknown)}")
+    missing = sorted(year for year in years if int(year) not in available_years)
+    if missing:
+        available = (f"available {min(available_years)}-{max(available_years)}"
+                     if available_years else 'no years available')
+        problems.append(f"no data for years: {', '.join(map(str, missing))} ({available})")
+    if problems:
+        raise ValueError('; '.join(problems))
+
+
+# ============================================================================
+# FUNCTION: RENDER JOBS AGAINST ONE DATASET
+# ============================================================================
+def run_job(df_years, job, output_dir='.', profile='print'):
+    """
+    Runs a single (chart_name, kwargs) job and returns the written files.
+    """
+    name, kwargs = job
+    renderer, _ = RENDERERS[name]
+    return renderer(df_years, output_dir=output_dir, profile=profile, **kwargs)
+
+
+def job_fingerprint(df_years, job, profile='print'):
+    """
+    Fingerprints the data slice and parameters behind one job.
+    """
+    name, kwargs = job
+    return fingerprint(INPUTS[name](df_years, **kwargs), job, f"{charts.CHART_VERSION}:{profile}")
+
+
+def render_all(df_years, jobs, output_dir='.', workers=1, incremental=False, profile='print',
+               writer_threads=DEFAULT_WRITER_THREADS, uploader=None):
+    """
+    Runs every job against the same in-memory dataset and returns a
+    RenderReport.
+
+    Files are handed to an export writer with writer_threads threads, so
+    rendering continues while they are written (and, with an S3Uploader,
+    uploaded). workers > 1 (or 0/None for every core) renders through a
+    process pool.
+    With incremental=True, jobs whose data slice, parameters, output
+    profile and outputs are unchanged since the last build (see
+    BuildManifest) are skipped. Unknown countries or years raise
+    ValueError before anything is rendered (see check_jobs).
+    """
+    check_jobs(df_years, jobs)
+    os.makedirs(output_dir, exist_ok=True)
+
+    pending = jobs
+    if incremental:
+        manifest = BuildManifest(output_dir)
+        fingerprints = {job_key(job): job_fingerprint(df_years, job, profile) for job in jobs}
+        pending = [job for job in jobs if not manifest.is_fresh(job_key(job), fingerprints[job_key(job)])]
+
+    if workers == 1:
+        with export_writer(writer_threads, uploader):
+            outputs = _run_serial(df_years, pending, output_dir, profile)
+    else:
+        from hiv_charts.parallel import render_parallel
+        outputs = render_parallel(df_years, pending, output_dir=output_dir,
+                                  max_workers=workers or None, profile=profile,
+                                  writer_threads=writer_threads, uploader=uploader)
+
+    if incremental:
+        for job, paths in zip(pending, outputs):
+            manifest.record(job_key(job), fingerprints[job_key(job)], paths)
+        manifest.save()
+
+    written = [path for paths in outputs for path in paths]
+    return RenderReport(written, len(pending), len(jobs) - len(pending))
+
+
+def _run_serial(df_years, jobs, output_dir, profile):
+    if not any(name == 'world-map' for name, _ in jobs):
+        return [run_job(df_years, job, output_dir=output_dir, profile=profile) for job in jobs]
+
+    # Map image exports share one warm kaleido browser
+    from hiv_charts.mapexport import kaleido_session
+    with kaleido_session():
+        return [run_job(df_years, job, output_dir=output_dir, profile=profile) for job in jobs]
@@ -0,0 +1,291 @@
+# ============================================================================
+# LIBRARY IMPORTS
+# ============================================================================
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import tempfile
+import time
+import tracemalloc
+from collections import namedtuple
+from contextlib import nullcontext
+
+import matplotlib
+import numpy as np
+import pandas as pd
+
+from hiv_charts import charts
+from hiv_charts.aggregates import IndicatorAggregates, aggregates_path, dataset_version, get_aggregates
+from hiv_charts.cache import WORKBOOK_PATH, file_sha256, read_sheet
+from hiv_charts.data import LATIN_AMERICA, WORKBOOK_ATTR, load_yearly_data
+from hiv_charts.dataset import parse_cells
+from hiv_charts.index import CountryIndex
+from hiv_charts.normalize import normalized_cube
+from hiv_charts.reshape import keep_top_series, pivot_indicators, prepare_stacked_data, sex_long_table
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Year and country every per-year / per-country benchmark uses
+BENCH_YEAR = 2024
+BENCH_COUNTRY = 'Colombia'
+
+# One benchmark: name is '<stage>.<step>', chart is the chart it belongs to
+# (None for shared steps). setup(context) returns the arguments of run and
+# is not timed; scaled=False runs only against the bundled workbook.
+Benchmark = namedtuple('Benchmark', ['name', 'chart', 'setup', 'run', 'scaled'])
+
+
+# ============================================================================
+# FUNCTION: SYNTHETIC SCALING
+# ============================================================================
+def scale_dataset(df_years, factor):
+    """
+    Returns a dataset with factor times as many countries: every country is
+    copied factor - 1 times as '<name> #<n>'. Rows stay in year-major order
+    and the original countries keep their names, so every chart still finds
+    them.
+    """
+    if factor <= 1:
+        return df_years
+
+    copies = [df_years]
+    for n in range(2, factor + 1):
+        copy = df_years.copy()
+        copy['Country'] = copy['Country'].astype(str) + f' #{n}'
+        copies.append(copy)
+
+    scaled = pd.concat(copies, ignore_index=True)
+    scaled['Country'] = scaled['Country'].astype(str).astype('category')
+    scaled['Code'] = scaled['Code'].astype(str).astype('category')
+    order = np.argsort(scaled['Years'].to_numpy(), kind='stable')
+    return scaled.iloc[order].reset_index(drop=True)
+
+
+# ============================================================================
+# BENCHMARK DEFINITIONS
+# ============================================================================
+def _fresh_workbook(context):
+    # A copy in its own directory has no columnar cache next to it
+    directory = tempfile.mkdtemp(dir=context['scratch_dir'])
+    path = os.path.join(directory, os.path.basename(context['file_path']))
+    shutil.copyfile(context['file_path'], path)
+    return (path,)
+
+
+def _dataset(context):
+    return (context['df_years'],)
+
+
+def _raw_sheet(context):
+    df = read_sheet(context['file_path'], sheet_name=1)
+    return (df.iloc[:, 3:],)
+
+
+def _world_map_figure(context):
+    return (charts.build_world_map(context['df_years'], BENCH_YEAR, 'know_status_all_ages'),
+            os.path.join(context['scratch_dir'], 'bench_map'))
+
+
+def _renderer(renderer, **kwargs):
+    def run(df_years, output_dir):
+        return renderer(df_years, output_dir=output_dir, **kwargs)
+    return run
+
+
+def _render_args(context):
+    return (context['df_years'], context['scratch_dir'])
+
+
+def _warm_render_args(context):
+    # Aggregates are timed on their own (transform.aggregates, load.aggregates);
+    # materializing them here keeps every repeat of the render identical
+    get_aggregates(context['df_years'])
+    return _render_args(context)
+
+
+def _saved_aggregates(context):
+    df_years = context['df_years']
+    get_aggregates(df_years)
+    return (aggregates_path(df_years.attrs[WORKBOOK_ATTR], dataset_version(df_years)),)
+
+
+def benchmarks():
+    """
+    Returns every Benchmark: workbook loading, the transforms behind each
+    chart, and each chart's rendering and export.
+    """
+    return [
+        # Loading
+        Benchmark('load.read_excel', None, _fresh_workbook,
+                  lambda path: pd.read_excel(path, sheet_name=1, header=0), False),
+        Benchmark('load.cold_cache', None, _fresh_workbook, load_yearly_data, False),
+        Benchmark('load.cached', None, lambda context: (context['file_path'],),
+                  load_yearly_data, False),
+        Benchmark('load.streamed_country', None, _fresh_workbook,
+                  lambda path: load_yearly_data(path, countries=[BENCH_COUNTRY]), False),
+        Benchmark('load.to_numeric', None, _raw_sheet,
+                  lambda df: df.apply(pd.to_numeric, errors='coerce'), False),
+        Benchmark('load.parse_cells', None, _raw_sheet, parse_cells, False),
+
+        # Shared transforms
+        Benchmark('transform.country_index', None, _dataset, CountryIndex, True),
+        Benchmark('transform.pivot', None, _dataset, pivot_indicators, True),
+        Benchmark('transform.aggregates', 'gap', _dataset, IndicatorAggregates.compute, True),
+        Benchmark('load.aggregates', 'gap', _saved_aggregates, IndicatorAggregates.load, True),
+
+        # Per-chart transforms
+        Benchmark('transform.world_map_data', 'world-map', _dataset,
+                  lambda df: charts.world_map_data(df, BENCH_YEAR, 'know_status_all_ages'), True),
+        Benchmark('transform.sex_long_table', 'sex-bar', _dataset,
+                  lambda df: sex_long_table(df, 'on_art'), True),
+        Benchmark('transform.heatmap_normalize', 'heatmap', _dataset,
+                  lambda df: normalized_cube(df, list(charts.HEATMAP_COLUMNS)), True),
+        Benchmark('transform.stacked_data', 'stacked-area', _dataset,
+                  lambda df: keep_top_series(
+                      prepare_stacked_data(df, 'suppressed_all_ages', LATIN_AMERICA), 5), True),
+
+        # Rendering and export
+        Benchmark('render.world_map_figure', 'world-map', _dataset,
+                  lambda df: charts.build_world_map(df, BENCH_YEAR, 'know_status_all_ages'), True),
+        Benchmark('render.world_map_html', 'world-map', _world_map_figure,
+                  lambda fig, stem: fig.write_html(stem + '.html'), True),
+        Benchmark('render.world_map_png', 'world-map', _world_map_figure,
+                  lambda fig, stem: fig.write_image(stem + '.png', width=charts.MAP_WIDTH,
+                                                    height=charts.MAP_HEIGHT), True),
+        Benchmark('render.sex_bar', 'sex-bar', _render_args,
+                  _renderer(charts.render_sex_bar_chart, target_year=BENCH_YEAR), True),
+        Benchmark('render.heatmap', 'heatmap', _warm_render_args,
+                  _renderer(charts.render_heatmap, country=BENCH_COUNTRY), True),
+        Benchmark('render.gap', 'gap', _warm_render_args,
+                  _renderer(charts.render_gap_chart, country=BENCH_COUNTRY), True),
+        Benchmark('render.stacked_area', 'stacked-area', _render_args,
+                  _renderer(charts.render_stacked_area), True),
+    ]
+
+
+# ============================================================================
+# FUNCTION: RUN THE SUITE
+# ============================================================================
+def run_benchmarks(file_path=WORKBOOK_PATH, scales=(1,), repeat=3, select=None, output=None):
+    """
+    Runs the suite against the workbook and against copies scaled to
+    several times its number of countries.
+
+    Each benchmark is timed repeat times (setup excluded), then run once
+    more under tracemalloc for its peak Python allocation. select keeps
+    only benchmarks whose name or chart contains one of the given strings.
+    Returns the report dict and, when output is given, writes it as JSON.
+    """
+    # Benchmarks only rasterize to files
+    matplotlib.use('Agg')
+    from hiv_charts.mapexport import browser_available, kaleido_session
+
+    suite = benchmarks()
+    if select:
+        suite = [b for b in suite if any(s in b.name or s in (b.chart or '') for s in select)]
+    has_browser = browser_available()
+
+    base = load_yearly_data(file_path)
+    results = []
+    with tempfile.TemporaryDirectory(prefix='hiv_charts-bench-') as scratch_dir, \
+            (kaleido_session() if has_browser else nullcontext()):
+        for scale in scales:
+            df_years = scale_dataset(base, scale)
+            # Aggregates of the synthetic datasets stay in the scratch directory
+            df_years.attrs[WORKBOOK_ATTR] = os.path.join(scratch_dir, os.path.basename(file_path))
+            context = {'file_path': file_path, 'df_years': df_years, 'scratch_dir': scratch_dir}
+
+            for bench in suite:
+                if scale != 1 and not bench.scaled:
+                    continue
+                entry = {
+                    'name': bench.name,
+                    'chart': bench.chart,
+                    'scale': scale,
+                    'rows': int(len(df_years)),
+                    'countries': int(df_years['Country'].nunique()),
+                }
+                if bench.name == 'render.world_map_png' and not has_browser:
+                    entry['skipped'] = 'no Chromium browser for kaleido'
+                    results.append(entry)
+                    continue
+                entry.update(_measure(bench, context, repeat))
+                results.append(entry)
+
+    report = {
+        'meta': _environment(file_path, repeat),
+        'results': results,
+    }
+    if output is not None:
+        with open(output, 'w', encoding='utf-8') as fh:
+            json.dump(report, fh, indent=1)
+    return report
+
+
+def format_report(report):
+    """
+    Returns the results as a plain-text table.
+    """
+    lines = [f"{'benchmark':<34}{'scale':>6}{'rows':>9}{'median ms':>12}{'min ms':>10}{'peak MB':>10}"]
+    for entry in report['results']:
+        if 'skipped' in entry:
+            lines.append(f"{entry['name']:<34}{entry['scale']:>6}{entry['rows']:>9}   skipped: {entry['skipped']}")
+            continue
+        lines.append(
+            f"{entry['name']:<34}{entry['scale']:>6}{entry['rows']:>9}"
+            f"{entry['median_s'] * 1e3:>12.2f}{entry['min_s'] * 1e3:>10.2f}"
+            f"{entry['peak_bytes'] / 1e6:>10.2f}"
+        )
+    return '\n'.join(lines)
+
+
+# ============================================================================
+# INTERNAL HELPERS
+# ============================================================================
+def _measure(bench, context, repeat):
+    times = []
+    for _ in range(repeat):
+        args = bench.setup(context)
+        start = time.perf_counter()
+        bench.run(*args)
+        times.append(time.perf_counter() - start)
+
+    args = bench.setup(context)
+    tracemalloc.start()
+    try:
+        bench.run(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'times_s': times,
+        'min_s': min(times),
+        'median_s': statistics.median(times),
+        'peak_bytes': peak,
+    }
+
+
+def _environment(file_path, repeat):
+    import plotly
+    import seaborn
+
+    return {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'workbook': os.path.basename(file_path),
+        'workbook_sha256': file_sha256(file_path),
+        'repeat': repeat,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'matplotlib': matplotlib.__version__,
+        'seaborn': seaborn.__version__,
+        'plotly': plotly.__version__,
+    }
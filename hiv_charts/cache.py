@@ -0,0 +1,243 @@
+# ============================================================================
+# LIBRARY IMPORTS
+# ============================================================================
+import hashlib
+import json
+import os
+import re
+import threading
+
+import openpyxl
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from hiv_charts.trace import stage
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Default workbook shipped with the repository
+WORKBOOK_PATH = "HIV_estimates_from_1990-to-2025.xlsx"
+
+# Cache directory name (created next to the workbook)
+CACHE_DIR_NAME = ".hiv_cache"
+
+# Bump when the on-disk cache layout changes
+CACHE_VERSION = 1
+
+# Cache entries derived from a workbook's content, named
+# '<stem>.<kind>.<hash>...'; all of them go when the workbook changes
+DERIVED_KINDS = ('sheet-[^.]+', 'aggregates', 'area')
+
+
+# ============================================================================
+# FUNCTION: WORKBOOK FINGERPRINT
+# ============================================================================
+def file_sha256(file_path, chunk_size=1 << 20):
+    """
+    Returns the SHA-256 hex digest of a file, read in chunks.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_dir_for(file_path):
+    """
+    Returns the cache directory used for a given workbook.
+    """
+    return os.path.join(os.path.dirname(os.path.abspath(file_path)), CACHE_DIR_NAME)
+
+
+def workbook_version(file_path):
+    """
+    Returns the content hash of a workbook, reusing the one recorded in the
+    cache manifest when the file's mtime and size have not changed.
+    """
+    stat = os.stat(file_path)
+    manifest_path = _manifest_path(file_path)
+    manifest = _read_manifest(manifest_path)
+
+    if (manifest.get('mtime_ns') == stat.st_mtime_ns
+            and manifest.get('size') == stat.st_size
+            and manifest.get('version') == CACHE_VERSION):
+        return manifest['sha256']
+
+    sha256 = file_sha256(file_path)
+    if manifest.get('sha256') != sha256 or manifest.get('version') != CACHE_VERSION:
+        # New content: previous sheets, headers, aggregates and area tables no longer apply
+        _remove_entries(file_path, DERIVED_KINDS)
+        manifest = {'sheets': {}, 'headers': {}}
+    manifest.update({
+        'version': CACHE_VERSION,
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'sha256': sha256,
+    })
+    _write_manifest(manifest_path, manifest)
+    return sha256
+
+
+# ============================================================================
+# FUNCTION: READ SHEET THROUGH THE COLUMNAR CACHE
+# ============================================================================
+def read_sheet(file_path=WORKBOOK_PATH, sheet_name=1, usecols=None):
+    """
+    Reads one sheet of the workbook (header on the first row), exactly as
+    pd.read_excel(file_path, sheet_name=sheet_name, header=0) would.
+
+    The first call converts the sheet to an Arrow IPC file under .hiv_cache/;
+    later calls memory-map that file instead of parsing the workbook again.
+    The cache is keyed on the workbook's content hash, so editing or replacing
+    the workbook invalidates it automatically.
+
+    usecols, a list of column positions, restricts the result to those
+    columns: they are the only ones read from the cache. When the sheet is
+    not cached yet it is parsed and cached whole first, since a partial
+    parse costs about as much and would leave the cache empty.
+    """
+    sha256 = workbook_version(file_path)
+    cache_path = _sheet_cache_path(file_path, sheet_name, sha256)
+    if usecols is not None:
+        usecols = sorted(usecols)
+
+    if os.path.exists(cache_path):
+        table = feather.read_table(cache_path, columns=usecols, memory_map=True)
+        return table.to_pandas()
+
+    with stage('load.excel', sheet=sheet_name) as st:
+        df = st.record(pd.read_excel(file_path, sheet_name=sheet_name, header=0))
+    table = pa.Table.from_pandas(_to_arrow_friendly(df), preserve_index=False)
+    _write_table_atomic(table, cache_path)
+
+    manifest_path = _manifest_path(file_path)
+    manifest = _read_manifest(manifest_path)
+    manifest.setdefault('sheets', {})[str(sheet_name)] = os.path.basename(cache_path)
+    _write_manifest(manifest_path, manifest)
+
+    if usecols is not None:
+        table = table.select(usecols)
+    return table.to_pandas()
+
+
+def cached_sheet_path(file_path=WORKBOOK_PATH, sheet_name=1):
+    """
+    Returns the Arrow cache file of a sheet, or None if it is not cached yet.
+    """
+    cache_path = _sheet_cache_path(file_path, sheet_name, workbook_version(file_path))
+    return cache_path if os.path.exists(cache_path) else None
+
+
+def read_header_rows(file_path=WORKBOOK_PATH, sheet_name=1, n_rows=1):
+    """
+    Returns the first n_rows rows of a sheet as lists of raw cell values.
+
+    Only those rows are streamed from the workbook, and the result is kept
+    in the cache manifest so later calls do not open the workbook at all.
+    """
+    workbook_version(file_path)
+    manifest_path = _manifest_path(file_path)
+    manifest = _read_manifest(manifest_path)
+    key = f"{sheet_name}:{n_rows}"
+
+    cached = manifest.get('headers', {}).get(key)
+    if cached is not None:
+        return cached
+
+    wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[sheet_name] if isinstance(sheet_name, int) else wb[sheet_name]
+        rows = [list(row) for row in ws.iter_rows(max_row=n_rows, values_only=True)]
+    finally:
+        wb.close()
+
+    manifest.setdefault('headers', {})[key] = rows
+    _write_manifest(manifest_path, manifest)
+    return rows
+
+
+def clear_cache(file_path=WORKBOOK_PATH):
+    """
+    Removes a workbook's cache entries: its sheets, manifest, aggregates and
+    area table. Entries of other workbooks sharing the directory are kept.
+    """
+    _remove_entries(file_path, DERIVED_KINDS + ('manifest',))
+
+
+# ============================================================================
+# INTERNAL HELPERS
+# ============================================================================
+def _to_arrow_friendly(df):
+    """
+    Gives every column a single Arrow type.
+
+    Indicator columns mix integers with UNAIDS text markers ('...', '<100',
+    '7.7 m'), so they are stored as strings; callers keep coercing them with
+    pd.to_numeric exactly as they did on the raw Excel frame.
+    """
+    df = df.copy()
+    for column in df.columns:
+        series = df[column]
+        if series.dtype != object:
+            continue
+        values = series.dropna()
+        if values.map(lambda v: isinstance(v, (int, float)) and not isinstance(v, bool)).all():
+            df[column] = pd.to_numeric(series)
+        else:
+            df[column] = series.where(series.isna(), series.astype(str))
+    return df
+
+
+def _remove_entries(file_path, kinds):
+    cache_dir = cache_dir_for(file_path)
+    if not os.path.isdir(cache_dir):
+        return
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    # The kind right after the stem keeps 'a.xlsx' from matching 'a.b.xlsx'
+    owned = re.compile(re.escape(stem) + r'\.(' + '|'.join(kinds) + r')\.')
+    for name in os.listdir(cache_dir):
+        if owned.match(name):
+            try:
+                os.remove(os.path.join(cache_dir, name))
+            except OSError:
+                pass
+
+
+def _sheet_cache_path(file_path, sheet_name, sha256):
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    name = f"{stem}.sheet-{sheet_name}.{sha256[:16]}.v{CACHE_VERSION}.arrow"
+    return os.path.join(cache_dir_for(file_path), name)
+
+
+def _manifest_path(file_path):
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(cache_dir_for(file_path), f"{stem}.manifest.json")
+
+
+def _read_manifest(manifest_path):
+    try:
+        with open(manifest_path, encoding='utf-8') as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(manifest_path, manifest):
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    # Unique per process and thread: a server and a batch run may fill one cache
+    tmp_path = f"{manifest_path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as fh:
+        json.dump(manifest, fh, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+
+def _write_table_atomic(table, cache_path):
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_path = f"{cache_path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    # Uncompressed so the file can be memory-mapped without decoding
+    feather.write_feather(table, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, cache_path)
@@ -0,0 +1,534 @@
+# ============================================================================
+# LIBRARY IMPORTS
+# ============================================================================
+import hashlib
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+import seaborn as sns
+import plotly.express as px
+
+from hiv_charts.aggregates import get_aggregates
+from hiv_charts.data import LATIN_AMERICA, country_slug
+from hiv_charts.export import write_output
+from hiv_charts.index import get_country_index
+from hiv_charts.normalize import normalize
+from hiv_charts.profiles import OUTPUT_PROFILES
+from hiv_charts.reshape import keep_top_series, prepare_stacked_data, sex_long_table
+from hiv_charts.trace import stage, traced
+
+# Bump when a renderer's output changes, so incremental builds redraw everything
+CHART_VERSION = 2
+
+# Spanish description of each indicator key, used in titles and axis labels
+INDICATOR_LABELS = {
+    'know_status': 'personas que viven con VIH y conocen su condición',
+    'on_art': 'personas que viven con VIH en tratamiento antirretroviral',
+    'suppressed': 'personas que viven con VIH con carga viral suprimida',
+    'know_status_pct': 'porcentaje de personas que viven con VIH y conocen su condición',
+    'on_art_pct': 'porcentaje de personas que viven con VIH en tratamiento antirretroviral',
+    'on_art_among_diagnosed_pct': 'porcentaje de personas diagnosticadas en tratamiento antirretroviral',
+    'suppressed_pct': 'porcentaje de personas que viven con VIH con carga viral suprimida',
+    'suppressed_among_on_art_pct': 'porcentaje de personas en tratamiento con carga viral suprimida',
+    'pmtct_need': 'mujeres embarazadas que necesitan antirretrovirales',
+    'pmtct_effective_regimen': 'mujeres embarazadas que reciben un régimen eficaz',
+    'pmtct_coverage_pct': 'porcentaje de mujeres embarazadas que reciben un régimen eficaz',
+}
+
+# Indicator name suffix -> qualifier appended to its description
+DISAGGREGATION_LABELS = {
+    'all_ages': '',
+    'children_0_14': ' (niños de 0 a 14 años)',
+    'adults_15plus': ' (adultos de 15+ años)',
+    'women_15plus': ' (mujeres de 15+ años)',
+    'men_15plus': ' (hombres de 15+ años)',
+}
+
+# Pixel size of the exported world map PNG
+MAP_WIDTH = 1920
+MAP_HEIGHT = 1080
+
+# ============================================================================
+# FUNCTION: WORLD CHOROPLETH MAP (World_map_2024.py)
+# ============================================================================
+@traced('plot.world_map')
+def render_world_map(df_years, target_year=2024, indicator_column='know_status_all_ages',
+                     output_dir='.', show=False, profile='print'):
+    """
+    Plots the world choropleth for one year and saves it as HTML plus an
+    image in the given OUTPUT_PROFILES profile (None writes the HTML only).
+    Returns the list of written files.
+    """
+    fig = build_world_map(df_years, target_year, indicator_column)
+
+    if show:
+        fig.show()
+
+    html_path = os.path.join(output_dir, f'mapa_mundial_hiv_{target_year}.html')
+    with stage('save.html', path=html_path):
+        html = fig.to_html().encode('utf-8')
+    write_output(html_path, html)
+    if profile is None:
+        return [html_path]
+
+    settings = _output_profile(profile)
+    image_path = os.path.join(output_dir, f'mapa_mundial_hiv_{target_year}.{settings.format}')
+    with stage(f'save.{settings.format}', path=image_path, profile=profile):
+        image = fig.to_image(format=settings.format, width=MAP_WIDTH, height=MAP_HEIGHT,
+                             scale=settings.map_scale)
+    write_output(image_path, image)
+    return [html_path, image_path]
+
+
+def world_map_data(df_years, target_year, indicator_column):
+    """
+    Returns the Country/Code/value rows plotted on the map for one year.
+    """
+    # Filter global data for the selected year
+    df_global = df_years[df_years['Years'] == target_year]
+
+    # Remove the global aggregate row that heads every year block
+    df_global = df_global[df_global['Country'] != 'Global']
+
+    # Keep only valid countries (non-null values)
+    return df_global[['Country', 'Code', indicator_column]].dropna()
+
+
+def build_world_map(df_years, target_year=2024, indicator_column='know_status_all_ages'):
+    """
+    Builds the styled world choropleth figure for one year.
+    """
+    df_clean = world_map_data(df_years, target_year, indicator_column)
+
+    fig = px.choropleth(
+        df_clean,
+        locations='Code',                        # ISO country codes
+        color=indicator_column,                  # Value to color by
+        hover_name='Country',                    # Hover label
+        hover_data={indicator_column: ':.2f', 'Code': False},
+        color_continuous_scale='YlGn',           # Color scale
+        labels={indicator_column: 'Valor'},      # Color bar label
+        title=f'Mapa Mundial de VIH - Año {target_year}'
+    )
+
+    # Configure map appearance
+    fig.update_geos(
+        projection_type='robinson',
+        showcoastlines=True,
+        coastlinecolor='white',
+        showland=True,
+        landcolor='lightgray',
+        showocean=True,
+        oceancolor='lightblue',
+        showcountries=True,
+        countrycolor='white'
+    )
+
+    # Layout settings
+    fig.update_layout(
+        title={
+            'text': world_map_title(target_year, indicator_column),
+            'x': 0.5,
+            'xanchor': 'center',
+            'y': 0.95,
+            'font': {'size': 24, 'family': 'Arial, sans-serif'}
+        },
+        geo=dict(showframe=False, showcoastlines=True),
+        height=600,
+        margin=dict(l=0, r=0, t=80, b=0)
+    )
+    return fig
+
+
+def update_world_map(fig, df_years, target_year, indicator_column='know_status_all_ages'):
+    """
+    Swaps the data and title of a figure from build_world_map to another
+    year in place, reusing its layout, geometry settings and color scale.
+    """
+    df_clean = world_map_data(df_years, target_year, indicator_column)
+    codes = df_clean['Code'].astype(str).to_numpy()
+    values = df_clean[indicator_column].to_numpy()
+
+    # customdata mirrors the hover_data columns px.choropleth attaches
+    customdata = np.empty((len(df_clean), 2), dtype=object)
+    customdata[:, 0] = values
+    customdata[:, 1] = codes
+
+    fig.update_traces(
+        locations=codes,
+        z=values,
+        hovertext=df_clean['Country'].astype(str).to_numpy(),
+        customdata=customdata,
+        selector=dict(type='choropleth')
+    )
+    fig.update_layout(title_text=world_map_title(target_year, indicator_column))
+    return fig
+
+
+def world_map_title(target_year, indicator_column='know_status_all_ages'):
+    label = _indicator_label(indicator_column)
+    return f'<b>Distribución Mundial {_of(label)} {label} - {target_year}</b>'
+
+
+def world_map_inputs(df_years, target_year=2024, indicator_column='know_status_all_ages'):
+    """
+    Returns the slice of data render_world_map reads.
+    """
+    return df_years.loc[df_years['Years'] == target_year, ['Country', 'Code', indicator_column]]
+
+
+# ============================================================================
+# FUNCTION: MEN VS WOMEN GROUPED BAR CHART (h_vs_m_tratamiento__bar_plot.py)
+# ============================================================================
+
+# Legend label of each sex in the bar chart
+SEX_LABELS = {'men': 'Hombres (15+ años)', 'women': 'Mujeres (15+ años)'}
+
+
+@traced('plot.sex_bar')
+def render_sex_bar_chart(df_years, target_year=2024, countries=LATIN_AMERICA,
+                         output_dir='.', show=False, profile='print'):
+    """
+    Plots men vs women (15+) per country for one year as a grouped bar chart.
+    Returns the list of written files.
+    """
+    df_year = sex_long_table(df_years, 'on_art', years=[target_year], countries=countries)
+    df_year = pd.DataFrame({
+        'País': df_year['Country'],
+        'Sexo': df_year['Sex'].map(SEX_LABELS),
+        'Valor': df_year['Value'],
+    })
+
+    # Sort countries by male values for visual clarity
+    order = (
+        df_year[df_year['Sexo'] == 'Hombres (15+ años)']
+        .sort_values('Valor', ascending=False)['País']
+    )
+    df_year['País'] = pd.Categorical(df_year['País'], categories=order, ordered=True)
+
+    sns.set_theme(style="whitegrid")
+    fig, ax = plt.subplots(figsize=(14, 7))
+
+    sns.barplot(
+        data=df_year,
+        x='País',
+        y='Valor',
+        hue='Sexo',
+        palette=['steelblue', 'lightcoral'],
+        ax=ax
+    )
+
+    ax.set_title(f'Comparación del VIH en Hombres y Mujeres (15+) - Año {target_year}',
+                 fontsize=16, fontweight='bold', pad=20)
+    ax.set_xlabel('País', fontsize=12)
+    ax.set_ylabel('Número de casos / prevalencia', fontsize=12)
+    plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+
+    ax.legend(title='Grupos por sexo', fontsize=10, title_fontsize=11)
+    ax.grid(axis='y', alpha=0.3, linestyle='--')
+    ax.get_yaxis().set_major_formatter(plt.FuncFormatter(lambda y, _: f'{int(y):,}'))
+    fig.tight_layout()
+
+    suffix = _selection_suffix({'countries': list(countries)}, {'countries': list(LATIN_AMERICA)})
+    png_path = os.path.join(output_dir, f'VIH_Hombres_Mujeres_{target_year}{suffix}_Seaborn.png')
+    return _save_matplotlib(fig, png_path, show, savefig_kwargs={},
+                            profile=profile)
+
+
+def sex_bar_chart_inputs(df_years, target_year=2024, countries=LATIN_AMERICA):
+    """
+    Returns the slice of data render_sex_bar_chart reads.
+    """
+    rows = (df_years['Years'] == target_year) & df_years['Country'].isin(list(countries))
+    return df_years.loc[rows, ['Country', 'on_art_men_15plus', 'on_art_women_15plus']]
+
+
+# ============================================================================
+# FUNCTION: COUNTRY HEATMAP (heat_map_HIV_colombia.py)
+# ============================================================================
+
+# Cascade indicators shown in the heatmap, with their figure labels
+HEATMAP_COLUMNS = {
+    'know_status_pct_all_ages': 'Porcentaje de personas que viven con VIH\nque conocen su condición',
+    'on_art_pct_all_ages': 'Porcentaje de personas que viven con VIH\ny están en tratamiento antirretroviral',
+    'on_art_among_diagnosed_pct_all_ages': 'Porcentaje de personas que viven con VIH\nque conocen su condición\ny están en tratamiento antirretroviral',
+    'suppressed_pct_all_ages': 'Porcentaje de personas que viven con VIH\ncon carga viral suprimida',
+    'suppressed_among_on_art_pct_all_ages': 'Porcentaje de personas que viven con VIH\nen tratamiento con carga viral suprimida'
+}
+
+
+@traced('plot.heatmap')
+def render_heatmap(df_years, country='Colombia', output_dir='.', show=False, profile='print'):
+    """
+    Plots the z-score normalized cascade indicators of one country by year.
+    Returns the list of written files.
+    """
+    df_country = get_country_index(df_years).get(country)
+    df_heatmap = df_country[list(HEATMAP_COLUMNS)]
+
+    # Fill missing values with the precomputed country means (avoids white gaps in heatmap)
+    means, _, _ = get_aggregates(df_years).stats(country, HEATMAP_COLUMNS)
+    df_heatmap = df_heatmap.fillna(pd.Series(means, index=df_heatmap.columns))
+
+    # Apply Z-score normalization for comparability across indicators
+    df_normalized = pd.DataFrame(
+        normalize(df_heatmap.to_numpy(), 'zscore'),
+        columns=df_heatmap.columns
+    )
+    df_normalized = df_normalized.rename(columns=HEATMAP_COLUMNS)
+
+    # Set years as index and transpose the DataFrame for plotting
+    df_normalized.index = df_country['Years'].values
+    df_normalized = df_normalized.T
+
+    fig, ax = plt.subplots(figsize=(16, 8))
+    sns.heatmap(
+        df_normalized,
+        annot=False,
+        cmap='coolwarm',
+        center=0,
+        linewidths=0.7,
+        linecolor='#333333',
+        cbar_kws={'label': 'Valores Normalizados'},
+        vmin=-2,
+        vmax=2,
+        square=False,
+        ax=ax
+    )
+
+    # Ensure all borders are visible and styled
+    for side in ['top', 'right', 'bottom', 'left']:
+        ax.spines[side].set_visible(True)
+        ax.spines[side].set_color('black')
+
+    ax.set_title(f'Mapa de Calor - {country} VIH (por Año)', fontsize=16, pad=20, fontweight='bold')
+    ax.set_xlabel('Años', fontsize=12, fontweight='bold')
+    plt.setp(ax.get_xticklabels(), rotation=90, ha='center', fontsize=9)
+    plt.setp(ax.get_yticklabels(), rotation=0, fontsize=10)
+    fig.tight_layout()
+
+    png_path = os.path.join(output_dir, f'mapa_calor_{country_slug(country).lower()}_vih.png')
+    return _save_matplotlib(fig, png_path, show, savefig_kwargs={'facecolor': 'white'},
+                            profile=profile)
+
+
+def heatmap_inputs(df_years, country='Colombia'):
+    """
+    Returns the slice of data render_heatmap reads.
+    """
+    return get_country_index(df_years).get(country)[['Years'] + list(HEATMAP_COLUMNS)]
+
+
+# ============================================================================
+# FUNCTION: TREATMENT GAP CHART (mujeres_embarazadas_grafico_brecha.py)
+# ============================================================================
+@traced('plot.gap')
+def render_gap_chart(df_years, country='Colombia', output_dir='.', show=False,
+                     profile='print'):
+    """
+    Plots pregnant women needing treatment vs those on an effective regimen,
+    shading the gap between both lines. Returns the list of written files.
+    """
+    df_country = get_country_index(df_years).get(country)
+    gap = get_aggregates(df_years).country_gap(country).reindex(df_country['Years']).to_numpy()
+
+    sns.set_theme(style="whitegrid")
+    fig, ax = plt.subplots(figsize=(12, 7))
+
+    # Línea 1: Necesidad de tratamiento
+    sns.lineplot(
+        data=df_country,
+        x='Years', y='pmtct_need',
+        color='red', linewidth=2.5, label='Personas que necesitan tratamiento',
+        ax=ax
+    )
+
+    # Línea 2: Tratamiento efectivo
+    sns.lineplot(
+        data=df_country,
+        x='Years', y='pmtct_effective_regimen',
+        color='green', linewidth=2.5, label='Personas en tratamiento efectivo',
+        ax=ax
+    )
+
+    # Rellenar el área entre las dos líneas
+    ax.fill_between(
+        df_country['Years'],
+        df_country['pmtct_need'],
+        df_country['pmtct_effective_regimen'],
+        where=(gap > 0),
+        color='lightcoral',
+        alpha=0.4,
+        label='Brecha (personas sin acceso)'
+    )
+
+    ax.set_title(
+        f'Brecha entre necesidad y tratamiento efectivo de VIH en {country} (2010–2025)',
+        fontsize=16, fontweight='bold', pad=20
+    )
+    ax.set_xlabel('Año', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Número de personas', fontsize=12, fontweight='bold')
+
+    ax.grid(alpha=0.3, linestyle='--')
+    ax.legend(title='Indicadores', fontsize=10, title_fontsize=11, loc='upper left')
+    ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, _: f'{int(x):,}'))
+    fig.tight_layout()
+
+    png_path = os.path.join(output_dir, f'brecha_tratamiento_VIH_{country_slug(country)}_Seaborn.png')
+    return _save_matplotlib(fig, png_path, show, savefig_kwargs={},
+                            profile=profile)
+
+
+def gap_chart_inputs(df_years, country='Colombia'):
+    """
+    Returns the slice of data render_gap_chart reads.
+    """
+    return get_country_index(df_years).get(country)[['Years', 'pmtct_need', 'pmtct_effective_regimen']]
+
+
+# ============================================================================
+# FUNCTION: STACKED AREA CHART (stacked_area_chart_LA.py)
+# ============================================================================
+@traced('plot.stacked_area')
+def render_stacked_area(df_years, countries=LATIN_AMERICA, indicator_column='suppressed_all_ages',
+                        top_n=None, output_dir='.', show=False, profile='print'):
+    """
+    Plots the stacked evolution of one indicator across a set of countries.
+    With top_n, only the largest top_n countries are drawn and the rest are
+    summed into an 'Otros' band. Returns the list of written files.
+    """
+    df_stacked = prepare_stacked_data(df_years, indicator_column, countries)
+
+    # Remove countries with all-zero data
+    df_stacked = df_stacked.loc[:, (df_stacked != 0).any(axis=0)]
+    df_stacked = keep_top_series(df_stacked, top_n)
+
+    sns.set_theme(style="whitegrid")
+    palette = sns.color_palette("Spectral", n_colors=len(df_stacked.columns))
+
+    fig, ax = plt.subplots(figsize=(18, 10))
+
+    # One stackplot call: baselines come from a single cumulative sum
+    ax.stackplot(
+        df_stacked.index,
+        df_stacked.to_numpy().T,
+        labels=df_stacked.columns,
+        colors=palette,
+        alpha=0.8,
+        linewidth=0.5
+    )
+
+    # Titles follow the indicator and countries requested
+    label = _indicator_label(indicator_column)
+    quantity = label if '_pct' in indicator_column else f'número de {label}'
+    ax.set_title(
+        f'Evolución del {quantity}\n'
+        f'en {_countries_label(countries)} ({df_stacked.index.min()}–{df_stacked.index.max()})',
+        fontsize=20, fontweight='bold', pad=20
+    )
+    ax.set_xlabel('Año', fontsize=14, fontweight='bold')
+    ax.set_ylabel(quantity[0].upper() + quantity[1:], fontsize=14, fontweight='bold')
+
+    ax.legend(
+        title='Países',
+        bbox_to_anchor=(1.02, 1),
+        loc='upper left',
+        frameon=True,
+        fontsize=10,
+        title_fontsize=12
+    )
+
+    ax.grid(alpha=0.3, linestyle='--', linewidth=0.5)
+    ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, _: f'{int(x):,}'))
+    fig.tight_layout()
+
+    suffix = _selection_suffix(
+        {'countries': list(countries), 'indicator': indicator_column, 'top_n': top_n},
+        {'countries': list(LATIN_AMERICA), 'indicator': 'suppressed_all_ages', 'top_n': None}
+    )
+    png_path = os.path.join(output_dir, f'Evolucion_VIH_Latam_2010_2024{suffix}_Seaborn.png')
+    return _save_matplotlib(fig, png_path, show, savefig_kwargs={'facecolor': 'white'},
+                            profile=profile)
+
+
+def stacked_area_inputs(df_years, countries=LATIN_AMERICA, indicator_column='suppressed_all_ages',
+                        top_n=None):
+    """
+    Returns the slice of data render_stacked_area reads.
+    """
+    rows = df_years['Country'].isin(list(countries))
+    return df_years.loc[rows, ['Years', 'Country', indicator_column]]
+
+
+# ============================================================================
+# INTERNAL HELPERS
+# ============================================================================
+def _indicator_label(indicator_column):
+    """
+    Returns the Spanish description of an indicator column, e.g.
+    'on_art_women_15plus' -> 'personas ... (mujeres de 15+ años)'.
+    """
+    # Longest key first: 'on_art_pct_...' must not match 'on_art'
+    for key in sorted(INDICATOR_LABELS, key=len, reverse=True):
+        if indicator_column == key or indicator_column.startswith(key + '_'):
+            suffix = indicator_column[len(key) + 1:]
+            return INDICATOR_LABELS[key] + DISAGGREGATION_LABELS.get(suffix, f' ({suffix})' if suffix else '')
+    return indicator_column
+
+
+def _of(label):
+    return 'del' if label.startswith('porcentaje') else 'de'
+
+
+def _countries_label(countries):
+    countries = list(countries)
+    if set(countries) == set(LATIN_AMERICA):
+        return 'Países de Latinoamérica y el Caribe'
+    if len(countries) == 1:
+        return countries[0]
+    if len(countries) <= 4:
+        return ', '.join(countries[:-1]) + f' y {countries[-1]}'
+    return f'{len(countries)} países'
+
+
+def _selection_suffix(selection, default):
+    """
+    Returns '' for the default selection and otherwise '_' plus a short
+    hash of it, so charts of different countries or indicators do not
+    overwrite each other's file.
+    """
+    if selection == default:
+        return ''
+    key = json.dumps(selection, sort_keys=True, default=str)
+    return '_' + hashlib.sha256(key.encode('utf-8')).hexdigest()[:8]
+
+
+def _output_profile(profile):
+    if profile not in OUTPUT_PROFILES:
+        raise ValueError(f"Unknown output profile '{profile}'. Choose from: {', '.join(OUTPUT_PROFILES)}")
+    return OUTPUT_PROFILES[profile]
+
+
+def _save_matplotlib(fig, png_path, show, savefig_kwargs, profile='print'):
+    settings = _output_profile(profile)
+
+    # The renderers name their output as PNG; other formats swap the extension
+    path = os.path.splitext(png_path)[0] + '.' + settings.format
+
+    # Fixed-layout profiles keep the tight_layout() positions of the figure
+    # instead of measuring a tight bounding box again at save time
+    if settings.tight:
+        savefig_kwargs = dict(savefig_kwargs, bbox_inches='tight')
+    # Render to memory; write_output hands the bytes to the active export
+    # writer (see hiv_charts.export) or writes them atomically
+    buffer = io.BytesIO()
+    with stage(f'save.{settings.format}', path=path, profile=profile, dpi=settings.dpi):
+        fig.savefig(buffer, format=settings.format, dpi=settings.dpi, **savefig_kwargs)
+    if show:
+        plt.show()
+    plt.close(fig)
+    return [write_output(path, buffer.getvalue())]
@@ -0,0 +1,70 @@
+# ============================================================================
+# LIBRARY IMPORTS
+# ============================================================================
+from hiv_charts.cache import WORKBOOK_PATH
+from hiv_charts.dataset import load_dataset
+from hiv_charts.index import get_country_index
+from hiv_charts.schema import ID_HEADERS
+
+# ============================================================================
+# LATIN AMERICA COUNTRIES
+# ============================================================================
+LATIN_AMERICA = [
+    'Mexico', 'Belize', 'Honduras', 'El Salvador', 'Costa Rica',
+    'Cuba', 'Bahamas', 'Haiti', 'Dominican Republic',
+    'Colombia', 'Venezuela', 'Guyana', 'Suriname',
+    'Ecuador', 'Peru', 'Brazil', 'Paraguay', 'Chile', 'Argentina'
+]
+
+# Identifier columns of the yearly sheet; everything else is an indicator
+ID_COLUMNS = ID_HEADERS
+
+# DataFrame.attrs key recording the workbook a dataset was loaded from, so
+# derived files (e.g. the aggregates) go to that workbook's cache directory
+WORKBOOK_ATTR = 'workbook'
+
+# DataFrame.attrs key marking loads restricted to some countries or years;
+# their aggregates stay in memory instead of adding a file per selection
+SUBSET_ATTR = 'subset'
+
+
+# ============================================================================
+# FUNCTION: LOAD AND NORMALIZE THE YEARLY SHEET
+# ============================================================================
+def load_yearly_data(file_path=WORKBOOK_PATH, indicators=None, countries=None, years=None):
+    """
+    Loads the yearly sheet (sheet 1) as the long DataFrame used by the
+    chart renderers: one row per (year, country), categorical 'Country' and
+    'Code', int16 'Years' and float32 indicator columns.
+
+    Cells are parsed once by HIVDataset (UNAIDS markers such as '...' or
+    '<100' become NaN). Indicator columns carry the stable names of the
+    sheet's IndicatorCatalog (e.g. 'on_art_men_15plus'); indicators
+    restricts the load to those names, countries and years to those rows.
+    """
+    df_years = load_dataset(file_path, indicators, sheet_name=1,
+                            countries=countries, years=years).to_frame()
+    df_years.attrs[WORKBOOK_ATTR] = file_path
+    df_years.attrs[SUBSET_ATTR] = countries is not None or years is not None
+    return df_years
+
+
+# ============================================================================
+# FUNCTION: CREATE COUNTRY DATAFRAMES
+# ============================================================================
+def create_country_dataframes(df_years, country_list):
+    """
+    Creates a dictionary of DataFrames — one per country, sorted by year.
+    Each DataFrame retains all columns from the original dataset.
+
+    The DataFrames are slices of a shared CountryIndex built once per
+    dataset, so no per-country scan or copy of the sheet is made.
+    """
+    return get_country_index(df_years).select(country_list)
+
+
+def country_slug(country):
+    """
+    Returns a filename-safe version of a country name.
+    """
+    return ''.join(ch if ch.isalnum() else '_' for ch in country).strip('_')
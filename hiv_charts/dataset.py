@@ -0,0 +1,215 @@
+# ============================================================================
+# LIBRARY IMPORTS
+# ============================================================================
+import numpy as np
+import pandas as pd
+
+from hiv_charts.cache import WORKBOOK_PATH
+from hiv_charts.schema import ID_HEADERS, read_indicators
+from hiv_charts.trace import stage, traced
+
+# ============================================================================
+# CELL FLAGS
+# ============================================================================
+
+# One flag per (country, year, indicator) cell, describing the raw value
+FLAG_VALUE = 0          # plain number
+FLAG_EMPTY = 1          # blank cell (value is NaN)
+FLAG_NOT_AVAILABLE = 2  # '...' (value is NaN)
+FLAG_BELOW = 3          # '<100', '<0.1' (value is NaN)
+FLAG_ABOVE = 4          # '>98' (value is NaN)
+FLAG_ROUNDED = 5        # '450 000', '7.7 m' (value is the parsed number)
+FLAG_INVALID = 6        # any other text (value is NaN)
+
+# Rounded UNAIDS notation: digits grouped with spaces, optional ' m' suffix
+_ROUNDED_PATTERN = r'^\d[\d ]*(?:\.\d+)?(?: ?m)?$'
+
+
+# ============================================================================
+# CLASS: TYPED HIV DATASET
+# ============================================================================
+class HIVDataset:
+    """
+    Compact, typed copy of a yearly sheet.
+
+    Country and Code are categoricals, Years is int16, and every indicator
+    lives in one C-contiguous float32 array of shape (country, year,
+    indicator) with a parallel uint8 flag array (see the FLAG_* constants).
+    Selecting a country, a year or an indicator returns a NumPy view.
+    """
+
+    def __init__(self, countries, codes, years, indicators, values, flags, present):
+        self.countries = pd.CategoricalIndex(countries, categories=countries, name='Country')
+        self.codes = pd.Categorical(codes)
+        self.years = np.asarray(years, dtype=np.int16)
+        self.indicators = list(indicators)
+        self.values = values
+        self.flags = flags
+        self.present = present
+
+        self._country_pos = {country: i for i, country in enumerate(countries)}
+        self._year_pos = {int(year): j for j, year in enumerate(self.years)}
+        self._indicator_pos = {name: k for k, name in enumerate(self.indicators)}
+
+    # ------------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------------
+    @classmethod
+    def from_sheet(cls, df_sheet):
+        """
+        Builds the dataset from a sheet as returned by read_indicators, parsing
+        every indicator cell in a single vectorized pass.
+        """
+        indicators = [c for c in df_sheet.columns if c not in ID_HEADERS]
+
+        country_codes, countries = pd.factorize(df_sheet['Country'])
+        year_values = pd.to_numeric(df_sheet['Years'], errors='coerce')
+        valid_rows = (country_codes >= 0) & year_values.notna().to_numpy()
+
+        years = np.sort(pd.unique(year_values[valid_rows])).astype(np.int16)
+        country_pos = country_codes[valid_rows]
+        year_pos = np.searchsorted(years, year_values[valid_rows].to_numpy())
+
+        parsed, parsed_flags = parse_cells(df_sheet.loc[valid_rows, indicators])
+
+        shape = (len(countries), len(years), len(indicators))
+        values = np.full(shape, np.nan, dtype=np.float32)
+        flags = np.full(shape, FLAG_EMPTY, dtype=np.uint8)
+        present = np.zeros(shape[:2], dtype=bool)
+        values[country_pos, year_pos] = parsed
+        flags[country_pos, year_pos] = parsed_flags
+        present[country_pos, year_pos] = True
+
+        # Country code of each country (first one seen)
+        codes = (
+            pd.Series(df_sheet['Code'].to_numpy()[valid_rows])
+            .groupby(country_pos).first()
+            .reindex(range(len(countries)))
+            .to_numpy()
+        )
+        return cls(list(countries), codes, years, indicators, values, flags, present)
+
+    # ------------------------------------------------------------------------
+    # Zero-copy selections
+    # ------------------------------------------------------------------------
+    def country(self, name):
+        """
+        Returns the (year, indicator) block of one country as a view.
+        """
+        return self.values[self._country_pos[name]]
+
+    def year(self, year):
+        """
+        Returns the (country, indicator) block of one year as a view.
+        """
+        return self.values[:, self._year_pos[int(year)]]
+
+    def indicator(self, name):
+        """
+        Returns the (country, year) block of one indicator as a view.
+        """
+        return self.values[:, :, self._indicator_pos[name]]
+
+    def indicator_position(self, name):
+        return self._indicator_pos[name]
+
+    def country_position(self, name):
+        return self._country_pos[name]
+
+    def year_position(self, year):
+        return self._year_pos[int(year)]
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + self.flags.nbytes + self.present.nbytes
+
+    # ------------------------------------------------------------------------
+    # Conversion
+    # ------------------------------------------------------------------------
+    @traced('reshape.to_frame')
+    def to_frame(self):
+        """
+        Returns the long (country, year) DataFrame used by the chart renderers:
+        categorical Country/Code, int16 Years and float32 indicators.
+        """
+        n_countries, n_years, n_indicators = self.values.shape
+        rows = self.present.reshape(-1)
+
+        country_idx = np.repeat(np.arange(n_countries), n_years)[rows]
+        year_idx = np.tile(np.arange(n_years), n_countries)[rows]
+
+        frame = pd.DataFrame(
+            self.values.reshape(-1, n_indicators)[rows],
+            columns=self.indicators
+        )
+        frame.insert(0, 'Country', pd.Categorical.from_codes(country_idx, self.countries.categories))
+        frame.insert(0, 'Code', pd.Categorical.from_codes(
+            self.codes.codes[country_idx], self.codes.categories))
+        frame.insert(0, 'Years', self.years[year_idx])
+
+        # Keep the sheet's year-major row order
+        order = np.lexsort((country_idx, year_idx))
+        return frame.iloc[order].reset_index(drop=True)
+
+
+# ============================================================================
+# FUNCTION: PARSE RAW CELLS
+# ============================================================================
+@traced('clean.parse_cells')
+def parse_cells(df_raw):
+    """
+    Parses a block of raw sheet cells into float32 values and uint8 flags.
+
+    Numbers pass through, '450 000' and '7.7 m' are expanded and flagged as
+    rounded, and UNAIDS markers ('...', '<100', '>98') become NaN with their
+    own flag. Returns two arrays shaped like df_raw.
+    """
+    shape = df_raw.shape
+    raw = pd.Series(df_raw.to_numpy(dtype=object).reshape(-1))
+
+    values = pd.to_numeric(raw, errors='coerce').to_numpy(dtype=np.float64, copy=True)
+    flags = np.where(np.isnan(values), FLAG_INVALID, FLAG_VALUE).astype(np.uint8)
+    flags[raw.isna().to_numpy()] = FLAG_EMPTY
+
+    # Only text cells that did not parse need classifying
+    text_mask = flags == FLAG_INVALID
+    text = raw[text_mask].astype(str).str.strip()
+    text_flags = np.full(len(text), FLAG_INVALID, dtype=np.uint8)
+    text_values = np.full(len(text), np.nan)
+
+    text_flags[(text == '...').to_numpy()] = FLAG_NOT_AVAILABLE
+    text_flags[text.str.startswith('<').to_numpy()] = FLAG_BELOW
+    text_flags[text.str.startswith('>').to_numpy()] = FLAG_ABOVE
+
+    rounded = text.str.match(_ROUNDED_PATTERN).to_numpy()
+    if rounded.any():
+        rounded_text = text[rounded]
+        millions = rounded_text.str.endswith('m').to_numpy()
+        numbers = pd.to_numeric(
+            rounded_text.str.replace('m', '', regex=False).str.replace(' ', '', regex=False),
+            errors='coerce'
+        ).to_numpy()
+        text_values[rounded] = np.where(millions, numbers * 1e6, numbers)
+        text_flags[rounded] = FLAG_ROUNDED
+
+    values[text_mask] = text_values
+    flags[text_mask] = text_flags
+    return values.astype(np.float32).reshape(shape), flags.reshape(shape)
+
+
+# ============================================================================
+# FUNCTION: LOAD THE TYPED DATASET
+# ============================================================================
+def load_dataset(file_path=WORKBOOK_PATH, indicators=None, sheet_name=1,
+                 countries=None, years=None):
+    """
+    Loads a Test & Treat sheet into an HIVDataset, optionally restricted
+    to some catalog indicator names, countries and years.
+    """
+    with stage('load.read', sheet=sheet_name) as st:
+        df_sheet = st.record(read_indicators(file_path, indicators, sheet_name=sheet_name,
+                                             countries=countries, years=years))
+    with stage('clean.dataset') as st:
+        dataset = HIVDataset.from_sheet(df_sheet)
+        st.record(dataset.values)
+    return dataset
@@ -0,0 +1,238 @@
+# ============================================================================
+# LIBRARY IMPORTS
+# ============================================================================
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from hiv_charts.dataset import (FLAG_ABOVE, FLAG_BELOW, FLAG_EMPTY, FLAG_INVALID,
+                                FLAG_NOT_AVAILABLE, FLAG_ROUNDED, FLAG_VALUE, load_dataset)
+from hiv_charts.trace import stage
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Relative difference below which two values count as unchanged; the
+# default only ignores float32 round-off
+DEFAULT_TOLERANCE = 1e-6
+
+# Cell flag -> label used in the change table
+FLAG_LABELS = {
+    FLAG_VALUE: 'value',
+    FLAG_EMPTY: 'empty',
+    FLAG_NOT_AVAILABLE: '...',
+    FLAG_BELOW: 'below',
+    FLAG_ABOVE: 'above',
+    FLAG_ROUNDED: 'rounded',
+    FLAG_INVALID: 'invalid',
+}
+
+# Kind of each changed cell:
+#   revised  a number in both releases, with a different value
+#   added    a number only in the new release
+#   removed  a number only in the old release
+#   flag     same value (or none) but a different marker, e.g. '...' -> '<100'
+CHANGE_KINDS = ['revised', 'added', 'removed', 'flag']
+
+# Result of comparing two releases:
+#   changes    one row per changed (country, year, indicator) cell
+#   summary    per-indicator counts and revision sizes
+#   countries  (added, removed) country names
+#   years      (added, removed) years
+#   indicators (added, removed) indicator names; only shared ones are compared
+#   compared   number of (country, year, indicator) cells compared
+ReleaseDiff = namedtuple(
+    'ReleaseDiff',
+    ['changes', 'summary', 'countries', 'years', 'indicators', 'compared']
+)
+
+
+# ============================================================================
+# FUNCTION: COMPARE TWO RELEASES
+# ============================================================================
+def diff_releases(old_path, new_path, sheet_name=1, indicators=None, countries=None,
+                  tolerance=DEFAULT_TOLERANCE):
+    """
+    Compares two workbook releases cell by cell and returns a ReleaseDiff.
+
+    Both workbooks go through the columnar cache, so once each one has been
+    read a comparison only memory-maps the two sheets.
+    """
+    old = load_dataset(old_path, indicators, sheet_name=sheet_name)
+    new = load_dataset(new_path, indicators, sheet_name=sheet_name)
+    return diff_datasets(old, new, tolerance, countries)
+
+
+def diff_datasets(old, new, tolerance=DEFAULT_TOLERANCE, countries=None):
+    """
+    Compares two HIVDatasets.
+
+    Rows are matched on (country code, year) through hash lookups, so
+    renamed or reordered countries still line up. Both cubes are scattered
+    onto the union of rows and the shared indicators, and every cell is
+    classified in one vectorized pass (see CHANGE_KINDS). countries keeps
+    the countries carrying one of those names in either release.
+    """
+    with stage('diff.align') as st:
+        codes = pd.Index(np.union1d(np.asarray(old.codes, dtype=str), np.asarray(new.codes, dtype=str)))
+        if countries is not None:
+            wanted = set(countries)
+            codes = codes[[bool(names & wanted) for names in _country_names(old, new, codes, both=True)]]
+        years = np.union1d(old.years, new.years)
+        shared = [name for name in new.indicators if name in set(old.indicators)]
+        old_values, old_flags, old_rows = _align(old, codes, years, shared)
+        new_values, new_flags, new_rows = _align(new, codes, years, shared)
+        st.record(new_values)
+
+    with stage('diff.compare') as st:
+        old_nan, new_nan = np.isnan(old_values), np.isnan(new_values)
+        with np.errstate(invalid='ignore'):
+            same = np.abs(new_values - old_values) <= tolerance * np.abs(old_values)
+        same |= old_nan & new_nan
+
+        kinds = np.full(old_values.shape, -1, dtype=np.int8)
+        kinds[~old_nan & ~new_nan & ~same] = CHANGE_KINDS.index('revised')
+        kinds[old_nan & ~new_nan] = CHANGE_KINDS.index('added')
+        kinds[~old_nan & new_nan] = CHANGE_KINDS.index('removed')
+        # Markers only count as changed on rows both releases have
+        both_rows = (old_rows & new_rows)[:, :, None]
+        kinds[same & both_rows & (old_flags != new_flags)] = CHANGE_KINDS.index('flag')
+
+        code_idx, year_idx, indicator_idx = np.nonzero(kinds >= 0)
+        changes = _change_table(old, new, codes, years, shared, kinds,
+                                (code_idx, year_idx, indicator_idx),
+                                old_values, new_values, old_flags, new_flags)
+        st.record(changes)
+
+    return ReleaseDiff(
+        changes=changes,
+        summary=_summary(changes, shared, kinds, ~(old_nan & new_nan)),
+        countries=_added_removed(codes, _country_names(old, new, codes),
+                                 set(np.asarray(old.codes, dtype=str)), set(np.asarray(new.codes, dtype=str))),
+        years=(sorted(set(map(int, new.years)) - set(map(int, old.years))),
+               sorted(set(map(int, old.years)) - set(map(int, new.years)))),
+        indicators=([name for name in new.indicators if name not in old.indicators],
+                    [name for name in old.indicators if name not in new.indicators]),
+        compared=int(kinds.size),
+    )
+
+
+# ============================================================================
+# FUNCTION: TEXT REPORT
+# ============================================================================
+def format_diff(diff, top=20):
+    """
+    Returns the summary and the largest revisions as plain text.
+    """
+    counts = diff.changes['kind'].value_counts()
+    lines = [
+        f"{diff.compared} cells compared, {len(diff.changes)} changed ("
+        + ', '.join(f"{counts.get(kind, 0)} {kind}" for kind in CHANGE_KINDS) + ")"
+    ]
+    for label, (added, removed) in (('countries', diff.countries), ('years', diff.years),
+                                    ('indicators', diff.indicators)):
+        if added or removed:
+            lines.append(f"{label} added: {', '.join(map(str, added)) or 'none'}; "
+                         f"removed: {', '.join(map(str, removed)) or 'none'}")
+
+    changed = diff.summary[diff.summary['changed'] > 0]
+    if len(changed):
+        lines.append('')
+        lines.append(changed.to_string(float_format=lambda v: f"{v:.2f}"))
+
+    revised = diff.changes[diff.changes['kind'] == 'revised']
+    if len(revised) and top:
+        largest = revised.reindex(revised['pct_change'].abs().sort_values(ascending=False).index)
+        lines.append('')
+        lines.append(f"Largest revisions (top {min(top, len(largest))}):")
+        lines.append(largest.head(top)[['Country', 'Years', 'indicator', 'old', 'new', 'pct_change']]
+                     .to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+    return '\n'.join(lines)
+
+
+# ============================================================================
+# INTERNAL HELPERS
+# ============================================================================
+def _align(dataset, codes, years, indicators):
+    """
+    Scatters a dataset's values and flags onto the (code, year, indicator)
+    grid; rows the dataset does not have stay NaN / empty. Also returns the
+    (code, year) mask of rows present in the dataset.
+    """
+    code_pos = codes.get_indexer(np.asarray(dataset.codes, dtype=str))
+    year_pos = np.searchsorted(years, dataset.years)
+    indicator_pos = [dataset.indicator_position(name) for name in indicators]
+
+    # Countries filtered out of codes get -1, which would index the last row
+    keep = code_pos >= 0
+    shape = (len(codes), len(years), len(indicators))
+    values = np.full(shape, np.nan, dtype=np.float32)
+    flags = np.full(shape, FLAG_EMPTY, dtype=np.uint8)
+    grid = np.ix_(code_pos[keep], year_pos)
+    values[grid] = dataset.values[keep][:, :, indicator_pos]
+    flags[grid] = dataset.flags[keep][:, :, indicator_pos]
+    present = np.zeros(shape[:2], dtype=bool)
+    present[grid] = dataset.present[keep]
+    return values, flags, present
+
+
+def _change_table(old, new, codes, years, indicators, kinds, index,
+                  old_values, new_values, old_flags, new_flags):
+    code_idx, year_idx, indicator_idx = index
+    old_value = old_values[index].astype(np.float64)
+    new_value = new_values[index].astype(np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        pct_change = (new_value - old_value) / np.abs(old_value) * 100
+
+    country_names = np.array(_country_names(old, new, codes), dtype=object)
+    flag_labels = np.array([FLAG_LABELS[flag] for flag in sorted(FLAG_LABELS)], dtype=object)
+    return pd.DataFrame({
+        'Country': pd.Categorical(country_names[code_idx]),
+        'Code': codes[code_idx],
+        'Years': years[year_idx],
+        'indicator': pd.Categorical.from_codes(indicator_idx, indicators),
+        'kind': pd.Categorical.from_codes(kinds[index], CHANGE_KINDS),
+        'old': old_value,
+        'new': new_value,
+        'delta': new_value - old_value,
+        'pct_change': pct_change,
+        'old_flag': flag_labels[old_flags[index]],
+        'new_flag': flag_labels[new_flags[index]],
+    })
+
+
+def _summary(changes, indicators, kinds, compared):
+    """
+    Per-indicator table: cells with a value in either release, changed
+    cells by kind, and the median / largest absolute revision in percent.
+    """
+    summary = pd.DataFrame({'cells': compared.sum(axis=(0, 1))}, index=pd.Index(indicators, name='indicator'))
+    for code, kind in enumerate(CHANGE_KINDS):
+        summary[kind] = (kinds == code).sum(axis=(0, 1))
+    summary.insert(1, 'changed', summary[CHANGE_KINDS].sum(axis=1))
+
+    revised = changes[changes['kind'] == 'revised']
+    magnitude = revised['pct_change'].abs().groupby(revised['indicator'], observed=False)
+    summary['median_abs_pct'] = magnitude.median().reindex(summary.index)
+    summary['max_abs_pct'] = magnitude.max().reindex(summary.index)
+    return summary
+
+
+def _country_names(old, new, codes, both=False):
+    """
+    Returns the country name of each code: the new release's, or the old
+    one's for removed countries. With both=True, returns the set of names a
+    code has across the two releases instead.
+    """
+    old_names = dict(zip(np.asarray(old.codes, dtype=str), map(str, old.countries)))
+    new_names = dict(zip(np.asarray(new.codes, dtype=str), map(str, new.countries)))
+    if both:
+        return [{old_names.get(code), new_names.get(code)} - {None} for code in codes]
+    return [new_names.get(code, old_names.get(code)) for code in codes]
+
+
+def _added_removed(codes, names, old_codes, new_codes):
+    return ([name for code, name in zip(codes, names) if code not in old_codes],
+            [name for code, name in zip(codes, names) if code not in new_codes])
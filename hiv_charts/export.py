@@ -0,0 +1,181 @@
+# ============================================================================
+# LIBRARY IMPORTS
+# ============================================================================
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from hiv_charts.trace import stage
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Writer threads and rendered files allowed to wait for them; rendering
+# only blocks once max_pending files are queued
+DEFAULT_WRITER_THREADS = 4
+DEFAULT_MAX_PENDING = 64
+
+# Writer installed by export_writer(); None means write synchronously
+_active_writer = None
+
+
+# ============================================================================
+# FUNCTION: ATOMIC WRITES
+# ============================================================================
+def write_atomic(path, data):
+    """
+    Writes bytes to a temporary file in the target directory and renames
+    it into place, so readers never see a partially written file.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    # Unique per writer thread, so concurrent writes of one path never clash
+    tmp_path = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as fh:
+            fh.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def write_output(path, data):
+    """
+    Hands a rendered file to the active export writer, or writes it
+    atomically right away when no writer is active. Returns path.
+    """
+    if _active_writer is not None:
+        _active_writer.submit(path, data)
+    else:
+        with stage('write', path=path, bytes=len(data)):
+            write_atomic(path, data)
+    return path
+
+
+# ============================================================================
+# CLASS: S3 UPLOADER
+# ============================================================================
+class S3Uploader:
+    """
+    Uploads written files to an S3-compatible bucket, e.g. a local MinIO.
+
+    url is 's3://bucket/prefix'; each file is stored as prefix/<file name>.
+    endpoint_url points at the S3-compatible server (for MinIO, something
+    like http://localhost:9000); credentials come from the usual AWS
+    environment variables. Requires boto3.
+    """
+
+    def __init__(self, url, endpoint_url=None):
+        parsed = urlparse(url)
+        if parsed.scheme != 's3' or not parsed.netloc:
+            raise ValueError(f"Expected an upload target like s3://bucket/prefix, got {url!r}")
+        self.url = url
+        self.bucket = parsed.netloc
+        self.prefix = parsed.path.strip('/')
+        self.endpoint_url = endpoint_url
+        self._client = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # boto3 clients do not pickle; every process creates its own
+        return {'url': self.url, 'endpoint_url': self.endpoint_url}
+
+    def __setstate__(self, state):
+        self.__init__(state['url'], state['endpoint_url'])
+
+    def key_for(self, path):
+        name = os.path.basename(path)
+        return f"{self.prefix}/{name}" if self.prefix else name
+
+    def upload(self, path, data):
+        with stage('upload', key=self.key_for(path), bytes=len(data)):
+            self._get_client().put_object(Bucket=self.bucket, Key=self.key_for(path), Body=data)
+
+    def _get_client(self):
+        with self._lock:
+            if self._client is None:
+                try:
+                    import boto3
+                except ImportError:
+                    raise RuntimeError("Uploading to S3 requires boto3 (pip install boto3)") from None
+                self._client = boto3.client('s3', endpoint_url=self.endpoint_url)
+            return self._client
+
+
+# ============================================================================
+# CLASS: EXPORT WRITER
+# ============================================================================
+class ExportWriter:
+    """
+    Writes rendered files from a thread pool while the caller renders the
+    next figure. Every file is written atomically and, with an uploader,
+    also uploaded. close() waits for all writes and re-raises the first
+    error.
+    """
+
+    def __init__(self, max_workers=DEFAULT_WRITER_THREADS, max_pending=DEFAULT_MAX_PENDING,
+                 uploader=None):
+        self.uploader = uploader
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='hiv_charts-writer')
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._futures = []
+
+    def submit(self, path, data):
+        self._slots.acquire()
+        future = self._executor.submit(self._write, path, data)
+        future.add_done_callback(lambda _: self._slots.release())
+        self._futures.append(future)
+        return future
+
+    def _write(self, path, data):
+        with stage('write', path=path, bytes=len(data)):
+            write_atomic(path, data)
+        if self.uploader is not None:
+            self.uploader.upload(path, data)
+        return path
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        futures, self._futures = self._futures, []
+        for future in futures:
+            future.result()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+# ============================================================================
+# FUNCTION: ASYNC EXPORT BLOCK
+# ============================================================================
+@contextmanager
+def export_writer(max_workers=DEFAULT_WRITER_THREADS, uploader=None,
+                  max_pending=DEFAULT_MAX_PENDING):
+    """
+    Routes every chart written inside the block through one ExportWriter:
+    renderers produce in-memory buffers and go on with the next figure
+    while the pool writes (and optionally uploads) them. All files exist
+    when the block exits. Nested blocks reuse the outer writer.
+    """
+    global _active_writer
+    if _active_writer is not None:
+        yield _active_writer
+        return
+
+    writer = ExportWriter(max_workers, max_pending, uploader)
+    _active_writer = writer
+    try:
+        yield writer
+    finally:
+        _active_writer = None
+        writer.close()
@@ -0,0 +1,88 @@
+# ============================================================================
+# LIBRARY IMPORTS
+# ============================================================================
+import weakref
+
+import numpy as np
+import pandas as pd
+
+# Indexes already built, keyed on id() of the source DataFrame
+_index_cache = {}
+
+
+# ============================================================================
+# CLASS: COUNTRY / YEAR INDEX
+# ============================================================================
+class CountryIndex:
+    """
+    Groups the yearly sheet by country once.
+
+    Rows are stably sorted by (country code, year) a single time, and a
+    group-offset table records where each country's block starts and ends.
+    Looking up a country is then a dictionary hit plus a contiguous
+    positional slice, without scanning or copying the sheet.
+    """
+
+    def __init__(self, df_years):
+        codes, countries = pd.factorize(df_years['Country'], sort=False)
+        order = np.lexsort((df_years['Years'].to_numpy(), codes))
+
+        self.frame = df_years.iloc[order].reset_index(drop=True)
+        self.countries = list(countries)
+
+        counts = np.bincount(codes[order], minlength=len(countries))
+        self.offsets = np.concatenate(([0], np.cumsum(counts)))
+        self._positions = {country: i for i, country in enumerate(self.countries)}
+
+    def __contains__(self, country):
+        return country in self._positions
+
+    def __iter__(self):
+        return iter(self.countries)
+
+    def __len__(self):
+        return len(self.countries)
+
+    def bounds(self, country):
+        """
+        Returns the (start, stop) row positions of a country in self.frame.
+        """
+        position = self._positions.get(country)
+        if position is None:
+            return 0, 0
+        return int(self.offsets[position]), int(self.offsets[position + 1])
+
+    def get(self, country):
+        """
+        Returns the rows of one country sorted by year (empty if unknown).
+        """
+        start, stop = self.bounds(country)
+        return self.frame.iloc[start:stop]
+
+    __getitem__ = get
+
+    def select(self, country_list):
+        """
+        Returns {country: rows} for the requested countries, in list order.
+        """
+        return {country: self.get(country) for country in country_list}
+
+
+# ============================================================================
+# FUNCTION: SHARED INDEX PER DATASET
+# ============================================================================
+def get_country_index(df_years):
+    """
+    Returns the CountryIndex of a DataFrame, building it on first use.
+    The index is dropped automatically when the DataFrame is garbage collected.
+    Datasets are treated as immutable: copy a DataFrame before editing it.
+    """
+    key = id(df_years)
+    entry = _index_cache.get(key)
+    if entry is not None and entry[0]() is df_years:
+        return entry[1]
+
+    index = CountryIndex(df_years)
+    _index_cache[key] = (weakref.ref(df_years), index)
+    weakref.finalize(df_years, _index_cache.pop, key, None)
+    return index
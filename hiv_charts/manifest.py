@@ -0,0 +1,87 @@
+# ============================================================================
+# LIBRARY IMPORTS
+# ============================================================================
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Manifest file written in the output directory
+MANIFEST_NAME = '.render_manifest.json'
+
+
+# ============================================================================
+# FUNCTION: FINGERPRINTS
+# ============================================================================
+def job_key(job):
+    """
+    Returns a stable text key for a (chart_name, kwargs) job.
+    """
+    name, kwargs = job
+    return f"{name}:{json.dumps(kwargs, sort_keys=True, default=str)}"
+
+
+def fingerprint(df_slice, job, version):
+    """
+    Hashes the exact data a job reads together with its parameters and the
+    renderer version. Row order and column names are part of the hash.
+    """
+    digest = hashlib.sha256()
+    digest.update(job_key(job).encode('utf-8'))
+    digest.update(str(version).encode('utf-8'))
+    digest.update(json.dumps([str(c) for c in df_slice.columns]).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df_slice, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+# ============================================================================
+# CLASS: BUILD MANIFEST
+# ============================================================================
+class BuildManifest:
+    """
+    Records, per job, the fingerprint of its inputs and the files it wrote,
+    so unchanged figures can be skipped on the next build.
+    """
+
+    def __init__(self, output_dir='.'):
+        self.path = os.path.join(output_dir, MANIFEST_NAME)
+        try:
+            with open(self.path, encoding='utf-8') as fh:
+                self.entries = json.load(fh)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def is_fresh(self, key, fp):
+        """
+        True when the job was last built from the same inputs and all of
+        its output files still exist.
+        """
+        entry = self.entries.get(key)
+        return (
+            entry is not None
+            and entry['fingerprint'] == fp
+            and all(os.path.exists(path) for path in entry['outputs'])
+        )
+
+    def record(self, key, fp, outputs):
+        """
+        Stores a job's build; other jobs that had written one of the same
+        files are forgotten, since that file is no longer theirs.
+        """
+        outputs = list(outputs)
+        overwritten = set(outputs)
+        for other in [k for k in self.entries if k != key]:
+            if overwritten.intersection(self.entries[other]['outputs']):
+                del self.entries[other]
+        self.entries[key] = {'fingerprint': fp, 'outputs': outputs}
+
+    def save(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as fh:
+            json.dump(self.entries, fh, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
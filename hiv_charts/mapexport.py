@@ -0,0 +1,196 @@
+# ============================================================================
+# LIBRARY IMPORTS
+# ============================================================================
+import os
+from contextlib import contextmanager
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from hiv_charts.charts import (MAP_HEIGHT, MAP_WIDTH, build_world_map, update_world_map,
+                               world_map_title)
+from hiv_charts.export import DEFAULT_WRITER_THREADS, export_writer, write_output
+from hiv_charts.profiles import OUTPUT_PROFILES
+from hiv_charts.reshape import pivot_indicators
+from hiv_charts.trace import stage
+
+# Nesting depth of kaleido_session(); only the outermost one starts/stops
+_session_depth = 0
+
+
+# ============================================================================
+# FUNCTION: WARM KALEIDO SESSION
+# ============================================================================
+@contextmanager
+def kaleido_session(n_tabs=1):
+    """
+    Keeps one kaleido/Chromium instance running for the duration of the
+    block. Every image export (fig.to_image, pio.to_image, ...) made inside it
+    reuses that browser instead of launching a new one.
+
+    Without a Chromium browser the block runs without a session, so image
+    exports fail with plotly's usual 'install Chrome' error instead of
+    blocking on a server that could not start.
+    """
+    global _session_depth
+    if _session_depth == 0 and not browser_available():
+        yield
+        return
+
+    import kaleido
+    if _session_depth == 0:
+        kaleido.start_sync_server(n=n_tabs, silence_warnings=True)
+    _session_depth += 1
+    try:
+        yield
+    finally:
+        _session_depth -= 1
+        if _session_depth == 0:
+            kaleido.stop_sync_server(silence_warnings=True)
+
+
+def browser_available():
+    """
+    True when kaleido is installed and can find a Chromium-based browser.
+    """
+    try:
+        from choreographer.browsers.chromium import Chromium
+    except ImportError:
+        return False
+    return Chromium.find_browser(skip_local=False) is not None
+
+
+# ============================================================================
+# FUNCTION: EXPORT ONE MAP PER YEAR
+# ============================================================================
+def export_world_maps(df_years, years, indicator_column='know_status_all_ages',
+                      output_dir='.', html=True, n_tabs=1, profile='print',
+                      writer_threads=DEFAULT_WRITER_THREADS, uploader=None):
+    """
+    Exports the world choropleth for every year in one batch.
+
+    A single base figure is built and only its locations/z/hover arrays and
+    title are swapped per year; every image is rendered through one warm
+    kaleido session. With html=True the standalone HTML of each year is
+    written as well. profile selects the image format and scale (see
+    OUTPUT_PROFILES). Files go through an export writer with
+    writer_threads threads (and uploader, when given), so the next year
+    renders while the previous one is written. Returns the written files.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    years = list(years)
+    if not years:
+        return []
+
+    settings = OUTPUT_PROFILES[profile]
+    fig = build_world_map(df_years, years[0], indicator_column)
+    written = []
+    with export_writer(writer_threads, uploader), kaleido_session(n_tabs):
+        for year in years:
+            update_world_map(fig, df_years, year, indicator_column)
+            if html:
+                html_path = os.path.join(output_dir, f'mapa_mundial_hiv_{year}.html')
+                with stage('save.html', path=html_path):
+                    data = fig.to_html().encode('utf-8')
+                written.append(write_output(html_path, data))
+
+            image_path = os.path.join(output_dir, f'mapa_mundial_hiv_{year}.{settings.format}')
+            with stage(f'save.{settings.format}', path=image_path, profile=profile):
+                image = pio.to_image(fig, format=settings.format, width=MAP_WIDTH,
+                                     height=MAP_HEIGHT, scale=settings.map_scale)
+            written.append(write_output(image_path, image))
+    return written
+
+
+# ============================================================================
+# FUNCTION: MULTI-YEAR MAP WITH A YEAR SLIDER
+# ============================================================================
+def build_world_map_animation(df_years, years=None, indicator_column='know_status_all_ages'):
+    """
+    Builds one choropleth figure with a frame and a slider step per year.
+
+    Locations and hover names are stored once on the base trace; each frame
+    only carries that year's values as a float32 array (serialized by plotly
+    as a compact base64 typed array) and its title. The color scale is
+    fixed across years so frames are comparable.
+    """
+    cube = pivot_indicators(df_years, [indicator_column])
+    if years is None:
+        years = [int(y) for y in cube.years]
+    year_pos = [int(np.searchsorted(cube.years, y)) for y in years]
+    if any(p >= len(cube.years) or cube.years[p] != y for p, y in zip(year_pos, years)):
+        raise ValueError(f"Years {years} are not all present in the dataset")
+
+    values = cube.values[year_pos, :, 0].astype(np.float32)
+
+    # Keep countries with at least one value, minus the global aggregate
+    keep = ~np.isnan(values).all(axis=0) & (np.asarray(cube.countries, dtype=object) != 'Global')
+    countries = np.asarray(cube.countries, dtype=object)[keep]
+    values = values[:, keep]
+
+    codes_by_country = (
+        df_years[['Country', 'Code']].astype(str).drop_duplicates('Country')
+        .set_index('Country')['Code']
+    )
+    codes = codes_by_country.reindex(countries.astype(str)).to_numpy()
+
+    fig = build_world_map(df_years, years[0], indicator_column)
+    fig.update_traces(
+        locations=codes,
+        z=values[0],
+        hovertext=countries.astype(str),
+        customdata=None,
+        hovertemplate='<b>%{hovertext}</b><br><br>Valor=%{z:.2f}<extra></extra>',
+        selector=dict(type='choropleth')
+    )
+    fig.update_layout(coloraxis=dict(cmin=float(np.nanmin(values)), cmax=float(np.nanmax(values))))
+
+    fig.frames = [
+        go.Frame(
+            name=str(year),
+            data=[go.Choropleth(z=values[i])],
+            layout=go.Layout(title_text=world_map_title(year, indicator_column))
+        )
+        for i, year in enumerate(years)
+    ]
+
+    frame_args = dict(mode='immediate', frame=dict(duration=0, redraw=True), transition=dict(duration=0))
+    fig.update_layout(
+        sliders=[dict(
+            active=0,
+            currentvalue=dict(prefix='Año: '),
+            pad=dict(t=10),
+            steps=[
+                dict(label=str(year), method='animate', args=[[str(year)], frame_args])
+                for year in years
+            ]
+        )],
+        updatemenus=[dict(
+            type='buttons',
+            showactive=False,
+            x=0.05, y=0.05, xanchor='right', yanchor='top',
+            buttons=[
+                dict(label='▶', method='animate',
+                     args=[None, dict(frame_args, frame=dict(duration=700, redraw=True), fromcurrent=True)]),
+                dict(label='❚❚', method='animate', args=[[None], frame_args]),
+            ]
+        )],
+        height=650
+    )
+    return fig
+
+
+def export_world_map_animation(df_years, years=None, indicator_column='know_status_all_ages',
+                               output_dir='.', include_plotlyjs=True):
+    """
+    Writes the multi-year map to mapa_mundial_hiv_animado.html and returns
+    its path. include_plotlyjs is passed to fig.write_html: True embeds
+    plotly.js once in the file, 'directory' writes it next to the HTML so
+    several pages can share it, and 'cdn' references the public bundle.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    fig = build_world_map_animation(df_years, years, indicator_column)
+    html_path = os.path.join(output_dir, 'mapa_mundial_hiv_animado.html')
+    fig.write_html(html_path, include_plotlyjs=include_plotlyjs, auto_play=False)
+    return html_path
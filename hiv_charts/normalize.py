@@ -0,0 +1,94 @@
+# ============================================================================
+# LIBRARY IMPORTS
+# ============================================================================
+import warnings
+
+import numpy as np
+
+from hiv_charts.reshape import IndicatorCube, pivot_indicators
+from hiv_charts.trace import traced
+
+
+# ============================================================================
+# FUNCTION: NAN-AWARE SCALERS
+# ============================================================================
+def zscore(values, axis=0):
+    """
+    Centers on the mean and divides by the population standard deviation,
+    as StandardScaler does. Statistics are taken along axis (an int or a
+    tuple of axes), ignoring NaN; NaN cells stay NaN.
+    """
+    center = _nanstat(np.nanmean, values, axis)
+    scale = _nanstat(np.nanstd, values, axis)
+    return _apply(values, center, scale)
+
+
+def minmax(values, axis=0):
+    """
+    Maps the minimum to 0 and the maximum to 1 along axis, ignoring NaN.
+    """
+    low = _nanstat(np.nanmin, values, axis)
+    high = _nanstat(np.nanmax, values, axis)
+    return _apply(values, low, high - low)
+
+
+def robust(values, axis=0):
+    """
+    Centers on the median and divides by the interquartile range along
+    axis, ignoring NaN. Less sensitive to outlier years than zscore.
+    """
+    center = _nanstat(np.nanmedian, values, axis)
+    q25 = _nanstat(np.nanpercentile, values, axis, 25)
+    q75 = _nanstat(np.nanpercentile, values, axis, 75)
+    return _apply(values, center, q75 - q25)
+
+
+# Method name -> scaler
+METHODS = {
+    'zscore': zscore,
+    'minmax': minmax,
+    'robust': robust,
+}
+
+
+@traced('normalize')
+def normalize(values, method='zscore', axis=0):
+    """
+    Scales an array with one of METHODS, e.g. a whole (year, country,
+    indicator) cube at once: axis=0 normalizes every country's indicators
+    over its own years, axis=(0, 1) compares countries on a shared scale.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown normalization '{method}'. Choose from: {', '.join(METHODS)}")
+    return METHODS[method](np.asarray(values, dtype=float), axis)
+
+
+# ============================================================================
+# FUNCTION: NORMALIZED INDICATOR CUBE
+# ============================================================================
+def normalized_cube(df_years, indicators, countries=None, method='zscore', per_country=True):
+    """
+    Pivots indicators into a (year, country, indicator) cube and normalizes
+    it in one call. per_country=True scales each country over its own
+    years; False scales every indicator across all countries and years.
+    """
+    cube = pivot_indicators(df_years, indicators, countries)
+    axis = 0 if per_country else (0, 1)
+    return IndicatorCube(normalize(cube.values, method, axis), cube.years,
+                         cube.countries, cube.indicators)
+
+
+# ============================================================================
+# INTERNAL HELPERS
+# ============================================================================
+def _nanstat(func, values, axis, *args):
+    # All-NaN slices give NaN statistics; their warning adds nothing here
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        return func(values, *args, axis=axis, keepdims=True)
+
+
+def _apply(values, center, scale):
+    # Constant slices are only centered, like scikit-learn's scalers
+    scale = np.where(scale == 0, 1.0, scale)
+    return (values - center) / scale
@@ -0,0 +1,126 @@
+# ============================================================================
+# LIBRARY IMPORTS
+# ============================================================================
+import multiprocessing.util
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import pyarrow as pa
+import pyarrow.feather as feather
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# RAM-backed directory used for the shared dataset when available
+SHARED_MEMORY_DIR = '/dev/shm'
+
+# Dataset loaded once per worker process by _init_worker
+_worker_dataset = None
+
+# Whether this worker has already tried to start its kaleido browser
+_worker_kaleido = False
+
+
+# ============================================================================
+# FUNCTION: SHARE THE DATASET WITH WORKERS
+# ============================================================================
+def write_shared_dataset(df_years, directory=None):
+    """
+    Writes the normalized dataset to an uncompressed Arrow IPC file that
+    worker processes memory-map, so it is never pickled per job.
+    Returns the path of the file; the caller is responsible for removing it.
+    """
+    if directory is None and os.path.isdir(SHARED_MEMORY_DIR):
+        directory = SHARED_MEMORY_DIR
+    fd, path = tempfile.mkstemp(prefix='hiv_charts-', suffix='.arrow', dir=directory)
+    os.close(fd)
+    table = pa.Table.from_pandas(df_years, preserve_index=False)
+    feather.write_feather(table, path, compression='uncompressed')
+    return path
+
+
+def _init_worker(dataset_path):
+    global _worker_dataset
+
+    # Workers only rasterize to files; select Agg before pyplot is imported
+    import matplotlib
+    matplotlib.use('Agg')
+
+    _worker_dataset = feather.read_table(dataset_path, memory_map=True).to_pandas()
+
+
+def _start_worker_kaleido(job):
+    # Keep one kaleido browser per worker for map image exports, started by
+    # the worker's first world-map job. Workers exit through os._exit and
+    # skip atexit, so a multiprocessing finalizer stops the browser
+    global _worker_kaleido
+    if _worker_kaleido or job[0] != 'world-map':
+        return
+    _worker_kaleido = True
+
+    from hiv_charts.mapexport import browser_available
+    if browser_available():
+        import kaleido
+        kaleido.start_sync_server(silence_warnings=True)
+        multiprocessing.util.Finalize(None, kaleido.stop_sync_server,
+                                      kwargs={'silence_warnings': True}, exitpriority=0)
+
+
+def _run_worker_job(job, output_dir, profile='print', writer_threads=1, uploader=None):
+    from hiv_charts.batch import run_job
+    from hiv_charts.export import export_writer
+
+    _start_worker_kaleido(job)
+    # Each job's files (e.g. the map HTML and PNG) are written concurrently
+    with export_writer(writer_threads, uploader):
+        return run_job(_worker_dataset, job, output_dir=output_dir, profile=profile)
+
+
+def _render_worker_bytes(job, profile):
+    # Renders into a scratch directory and returns the bytes of the one
+    # requested output; profile None returns the world map's HTML
+    from hiv_charts.batch import run_job
+    from hiv_charts.profiles import OUTPUT_PROFILES
+
+    _start_worker_kaleido(job)
+    extension = 'html' if profile is None else OUTPUT_PROFILES[profile].format
+    scratch = SHARED_MEMORY_DIR if os.path.isdir(SHARED_MEMORY_DIR) else None
+    with tempfile.TemporaryDirectory(prefix='hiv_charts-', dir=scratch) as output_dir:
+        paths = run_job(_worker_dataset, job, output_dir=output_dir, profile=profile)
+        path = next(p for p in paths if p.endswith('.' + extension))
+        with open(path, 'rb') as fh:
+            return fh.read()
+
+
+# ============================================================================
+# FUNCTION: RENDER JOBS ACROSS A PROCESS POOL
+# ============================================================================
+def render_parallel(df_years, jobs, output_dir='.', max_workers=None, profile='print',
+                    writer_threads=1, uploader=None):
+    """
+    Fans render jobs out to a ProcessPoolExecutor.
+
+    The dataset is written once to a memory-mapped file that every worker
+    opens in its initializer; only the small (chart_name, kwargs) job
+    tuples cross the process boundary. Returns one list of written files
+    per job, in job order.
+    """
+    if not jobs:
+        return []
+    os.makedirs(output_dir, exist_ok=True)
+    max_workers = max_workers or os.cpu_count() or 1
+    max_workers = min(max_workers, max(len(jobs), 1))
+
+    dataset_path = write_shared_dataset(df_years)
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 initializer=_init_worker,
+                                 initargs=(dataset_path,)) as executor:
+            n = len(jobs)
+            outputs = list(executor.map(_run_worker_job, jobs, [output_dir] * n, [profile] * n,
+                                        [writer_threads] * n, [uploader] * n))
+    finally:
+        os.remove(dataset_path)
+    return outputs
@@ -0,0 +1,25 @@
+# ============================================================================
+# LIBRARY IMPORTS
+# ============================================================================
+from collections import namedtuple
+
+# ============================================================================
+# OUTPUT PROFILES
+# ============================================================================
+
+# How a chart is written:
+#   format     file format and extension
+#   dpi        raster resolution of the matplotlib charts
+#   tight      recompute a tight bounding box at save time (an extra layout
+#              and draw pass); fixed-layout profiles keep the figure's
+#              tight_layout() positions instead
+#   map_scale  world map image size relative to MAP_WIDTH x MAP_HEIGHT
+OutputProfile = namedtuple('OutputProfile', ['format', 'dpi', 'tight', 'map_scale'])
+
+OUTPUT_PROFILES = {
+    'print': OutputProfile('png', 300, True, 1.0),
+    'web': OutputProfile('png', 96, False, 0.5),
+    'webp': OutputProfile('webp', 96, False, 0.5),
+    'svg': OutputProfile('svg', 72, False, 1.0),
+    'pdf': OutputProfile('pdf', 72, False, 1.0),
+}
@@ -0,0 +1,128 @@
+# ============================================================================
+# LIBRARY IMPORTS
+# ============================================================================
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from hiv_charts.data import ID_COLUMNS
+from hiv_charts.schema import DISAGGREGATIONS
+from hiv_charts.trace import traced
+
+# Dense (year, country, indicator) cube with its axis labels
+IndicatorCube = namedtuple('IndicatorCube', ['values', 'years', 'countries', 'indicators'])
+
+# Sex -> column suffix of its disaggregation in the Test & Treat sheets
+SEX_SUFFIXES = {sex: suffix for sex, _, suffix in DISAGGREGATIONS.values() if sex != 'all'}
+
+
+# ============================================================================
+# FUNCTION: PIVOT THE LONG SHEET INTO A DENSE CUBE
+# ============================================================================
+@traced('reshape.pivot')
+def pivot_indicators(df_years, indicators=None, countries=None):
+    """
+    Reshapes the yearly sheet into a float64 array of shape
+    (years, countries, indicators) with a single scatter assignment.
+
+    indicators defaults to every indicator column and countries to every
+    country in the sheet. Requested countries that are not in the sheet get
+    an all-NaN slot, so the country axis always matches the request.
+    """
+    if indicators is None:
+        indicators = [c for c in df_years.columns if c not in ID_COLUMNS]
+    indicators = list(indicators)
+
+    if countries is None:
+        rows = df_years
+        countries = list(pd.unique(rows['Country']))
+    else:
+        countries = list(countries)
+        rows = df_years[df_years['Country'].isin(countries)]
+
+    years = np.sort(pd.unique(rows['Years'].dropna()))
+    year_pos = np.searchsorted(years, rows['Years'].to_numpy())
+    country_pos = pd.Index(countries).get_indexer(rows['Country'])
+
+    values = np.full((len(years), len(countries), len(indicators)), np.nan)
+    values[year_pos, country_pos, :] = rows[indicators].to_numpy(dtype=float, na_value=np.nan)
+
+    return IndicatorCube(values, years, countries, indicators)
+
+
+# ============================================================================
+# FUNCTION: SEX-DISAGGREGATED LONG TABLE
+# ============================================================================
+@traced('reshape.sex_long_table')
+def sex_long_table(df_years, indicator='on_art', years=None, countries=None,
+                   sexes=('men', 'women')):
+    """
+    Returns the tidy (Country, Years, Sex, Value) table of one indicator
+    group, e.g. 'on_art' -> on_art_men_15plus / on_art_women_15plus.
+
+    The sex columns are pivoted into one cube and melted in a single pass;
+    (country, year) pairs missing any of the sexes are dropped with a mask,
+    so every remaining pair can be compared directly. Rows are ordered by
+    year, then country (in the order of countries), then sex.
+    """
+    columns = [f"{indicator}_{SEX_SUFFIXES[sex]}" for sex in sexes]
+    cube = pivot_indicators(df_years, columns, countries)
+
+    values = cube.values
+    if years is not None:
+        keep_years = np.isin(cube.years, [int(y) for y in years])
+        values = values[keep_years]
+        cube_years = cube.years[keep_years]
+    else:
+        cube_years = cube.years
+
+    year_idx, country_idx = np.nonzero(~np.isnan(values).any(axis=2))
+    n_sexes = len(sexes)
+
+    return pd.DataFrame({
+        'Country': np.repeat(np.asarray(cube.countries, dtype=object)[country_idx], n_sexes),
+        'Years': np.repeat(cube_years[year_idx], n_sexes),
+        'Sex': np.tile(np.asarray(sexes, dtype=object), len(year_idx)),
+        'Value': values[year_idx, country_idx].reshape(-1),
+    })
+
+
+# ============================================================================
+# FUNCTION: PREPARE DATA FOR STACKED AREA CHART
+# ============================================================================
+@traced('reshape.stacked_data')
+def prepare_stacked_data(df_years, indicator_column, countries):
+    """
+    Builds the wide table of one indicator with 'Years' as the index and
+    countries as columns. Empty years are removed and remaining gaps
+    filled with 0.
+    """
+    cube = pivot_indicators(df_years, [indicator_column], countries)
+    data_stacked = pd.DataFrame(
+        cube.values[:, :, 0],
+        index=pd.Index(cube.years, name='Years'),
+        columns=cube.countries
+    )
+    return data_stacked.dropna(how="all").fillna(0)
+
+
+# ============================================================================
+# FUNCTION: KEEP THE TOP-N SERIES
+# ============================================================================
+def keep_top_series(data_stacked, top_n, other_label='Otros'):
+    """
+    Keeps the top_n columns with the largest total and sums the rest into
+    a single trailing column named other_label. Kept columns retain their
+    original order.
+    """
+    if top_n is None or data_stacked.shape[1] <= top_n:
+        return data_stacked
+
+    totals = data_stacked.to_numpy().sum(axis=0)
+    keep = np.zeros(len(totals), dtype=bool)
+    keep[np.argsort(-totals, kind='stable')[:top_n]] = True
+
+    data_top = data_stacked.loc[:, keep].copy()
+    data_top[other_label] = data_stacked.to_numpy()[:, ~keep].sum(axis=1)
+    return data_top
@@ -0,0 +1,282 @@
+# ============================================================================
+# LIBRARY IMPORTS
+# ============================================================================
+import re
+from collections import namedtuple
+
+import pandas as pd
+
+from hiv_charts.cache import WORKBOOK_PATH, cached_sheet_path, read_header_rows, read_sheet
+from hiv_charts.stream import stream_table
+
+# ============================================================================
+# INDICATOR RECORD
+# ============================================================================
+
+# One indicator column of a sheet:
+#   name      stable column name used by the charts (e.g. 'on_art_men_15plus')
+#   indicator indicator key shared by every disaggregation (e.g. 'on_art')
+#   title     human readable indicator title
+#   sex       'all', 'women' or 'men'
+#   age       'all', '0-14', '15+', '15-24', '15-49' or 'pregnant'
+#   bound     'estimate', 'low' or 'high'
+#   position  zero-based column position in the sheet
+#   header    raw header text of the column
+Indicator = namedtuple(
+    'Indicator',
+    ['name', 'indicator', 'title', 'sex', 'age', 'bound', 'position', 'header']
+)
+
+# Identifier columns at the start of every sheet
+ID_HEADERS = ['Years', 'Code', 'Country']
+
+# ============================================================================
+# TEST & TREAT LAYOUT (sheets 1 and 2)
+# ============================================================================
+
+# The Test & Treat sheets only carry the sex/age label of each column; the
+# indicator is given by the position of its block. Blocks appear in this
+# order and each one starts with its 'All ages' column.
+TEST_TREAT_BLOCKS = [
+    ('know_status_pct', 'Percent of people living with HIV who know their status'),
+    ('on_art_pct', 'Percent of people living with HIV who are on ART'),
+    ('on_art_among_diagnosed_pct', 'Percent of people who know their status who are on ART'),
+    ('suppressed_pct', 'Percent of people living with HIV with suppressed viral load'),
+    ('suppressed_among_on_art_pct', 'Percent of people on ART with suppressed viral load'),
+    ('know_status', 'Number of people living with HIV who know their status'),
+    ('on_art', 'Number of people living with HIV on ART'),
+    ('suppressed', 'Number of people living with HIV with suppressed viral load'),
+]
+
+# Trailing single-column indicators: (name, title, expected header)
+TEST_TREAT_TRAILING = [
+    ('pmtct_need', 'Pregnant women needing antiretrovirals for PMTCT', None),
+    ('pmtct_effective_regimen', 'Pregnant women receiving an effective regimen', 'Effective regimen'),
+    ('pmtct_coverage_pct', 'Percent of pregnant women receiving an effective regimen', 'Effective regimen'),
+]
+
+# Normalized sex/age label -> (sex, age, name suffix)
+DISAGGREGATIONS = {
+    'all ages': ('all', 'all', 'all_ages'),
+    'children, ages 0-14': ('all', '0-14', 'children_0_14'),
+    'adults, ages 15+': ('all', '15+', 'adults_15plus'),
+    'women, ages 15+': ('women', '15+', 'women_15plus'),
+    'men, ages 15+': ('men', '15+', 'men_15plus'),
+}
+
+# ============================================================================
+# ESTIMATES LAYOUT (sheet 0)
+# ============================================================================
+
+# Row holding the indicator titles and row holding Estimate/Low/High
+ESTIMATES_TITLE_ROW = 4
+ESTIMATES_BOUND_ROW = 5
+
+# Number of rows above the first data row, per sheet
+HEADER_ROWS = {0: 6, 1: 1, 2: 1}
+
+
+# ============================================================================
+# CLASS: INDICATOR CATALOG
+# ============================================================================
+class IndicatorCatalog:
+    """
+    Typed description of the indicator columns of one sheet.
+    """
+
+    def __init__(self, indicators, header_rows):
+        self.indicators = list(indicators)
+        self.header_rows = header_rows
+        self._by_name = {ind.name: ind for ind in self.indicators}
+
+    def __contains__(self, name):
+        return name in self._by_name
+
+    def __getitem__(self, name):
+        try:
+            return self._by_name[name]
+        except KeyError:
+            raise KeyError(f"Unknown indicator column '{name}'") from None
+
+    def __iter__(self):
+        return iter(self.indicators)
+
+    def __len__(self):
+        return len(self.indicators)
+
+    def names(self):
+        return [ind.name for ind in self.indicators]
+
+    def find(self, indicator=None, sex=None, age=None, bound=None):
+        """
+        Returns the indicators matching every given attribute.
+        """
+        return [
+            ind for ind in self.indicators
+            if (indicator is None or ind.indicator == indicator)
+            and (sex is None or ind.sex == sex)
+            and (age is None or ind.age == age)
+            and (bound is None or ind.bound == bound)
+        ]
+
+
+# ============================================================================
+# FUNCTION: RESOLVE THE CATALOG OF A SHEET
+# ============================================================================
+def resolve_catalog(file_path=WORKBOOK_PATH, sheet_name=1):
+    """
+    Reads the header rows of a sheet and maps every indicator column to a
+    stable name. Raises ValueError when the headers do not match the
+    expected layout, instead of letting charts pick up the wrong column.
+    """
+    if sheet_name not in HEADER_ROWS:
+        raise ValueError(f"No known header layout for sheet {sheet_name!r}")
+    header_rows = HEADER_ROWS[sheet_name]
+    rows = read_header_rows(file_path, sheet_name, n_rows=header_rows)
+
+    if sheet_name == 0:
+        indicators = _resolve_estimates(rows)
+    else:
+        indicators = _resolve_test_treat(rows[0])
+    return IndicatorCatalog(indicators, header_rows)
+
+
+def _resolve_test_treat(header):
+    _check_id_headers(header)
+
+    indicators = []
+    position = len(ID_HEADERS)
+    for key, title in TEST_TREAT_BLOCKS:
+        seen = set()
+        while position < len(header):
+            label = _normalize_label(header[position])
+            if label not in DISAGGREGATIONS:
+                break
+            if label == 'all ages' and seen:
+                break
+            if label in seen:
+                raise ValueError(f"Column {position}: repeated '{header[position]}' in block '{key}'")
+            seen.add(label)
+            sex, age, suffix = DISAGGREGATIONS[label]
+            indicators.append(Indicator(f"{key}_{suffix}", key, title, sex, age,
+                                        'estimate', position, header[position]))
+            position += 1
+        if seen != set(DISAGGREGATIONS):
+            raise ValueError(f"Block '{key}' ending at column {position} does not have the "
+                             f"expected sex/age columns (found {sorted(seen)})")
+
+    for key, title, expected in TEST_TREAT_TRAILING:
+        found = header[position] if position < len(header) else None
+        if position >= len(header) or _normalize_label(found) != _normalize_label(expected):
+            raise ValueError(f"Column {position}: expected header {expected!r} for '{key}', found {found!r}")
+        indicators.append(Indicator(key, key, title, 'women', 'pregnant', 'estimate', position, found))
+        position += 1
+
+    return indicators
+
+
+def _resolve_estimates(rows):
+    titles = rows[ESTIMATES_TITLE_ROW]
+    bounds = rows[ESTIMATES_BOUND_ROW]
+
+    indicators = []
+    title = None
+    for position in range(len(ID_HEADERS), len(bounds)):
+        if titles[position] is not None:
+            title = str(titles[position]).strip()
+        bound = str(bounds[position] or '').strip().lower()
+        if title is None or bound not in ('estimate', 'low', 'high'):
+            raise ValueError(f"Column {position}: cannot resolve indicator header "
+                             f"({titles[position]!r}, {bounds[position]!r})")
+        key = _slug(title)
+        sex, age = _parse_disaggregation(title)
+        indicators.append(Indicator(f"{key}_{bound}", key, title, sex, age, bound, position, title))
+    return indicators
+
+
+# ============================================================================
+# FUNCTION: READ SELECTED INDICATORS
+# ============================================================================
+def read_indicators(file_path=WORKBOOK_PATH, indicators=None, sheet_name=1,
+                    countries=None, years=None):
+    """
+    Reads the identifier columns plus the requested indicators of a sheet,
+    renamed to their catalog names. Values are returned as stored in the
+    sheet; only the requested columns are read.
+
+    countries and years filter the rows. When the sheet is not in the
+    columnar cache yet, the filtered load streams the workbook in read-only
+    mode and keeps only the matching rows, instead of parsing the whole sheet.
+    """
+    catalog = resolve_catalog(file_path, sheet_name)
+    if indicators is None:
+        selected = list(catalog)
+    else:
+        selected = sorted((catalog[name] for name in indicators), key=lambda ind: ind.position)
+
+    positions = list(range(len(ID_HEADERS))) + [ind.position for ind in selected]
+    names = ID_HEADERS + [ind.name for ind in selected]
+    filtered = countries is not None or years is not None
+
+    if filtered and cached_sheet_path(file_path, sheet_name) is None:
+        table = stream_table(file_path, sheet_name, positions=positions, names=names,
+                             header_rows=catalog.header_rows, countries=countries, years=years)
+        return table.to_pandas()
+
+    df = read_sheet(file_path, sheet_name=sheet_name,
+                    usecols=None if indicators is None else positions)
+    if indicators is None:
+        df = df.iloc[:, positions]
+
+    # Skip the header rows below the first one (sheet 0 has a multi-row header)
+    df = df.iloc[catalog.header_rows - 1:].reset_index(drop=True)
+    df.columns = names
+
+    if filtered:
+        keep = df['Country'].notna()
+        if countries is not None:
+            keep &= df['Country'].isin(list(countries))
+        if years is not None:
+            keep &= pd.to_numeric(df['Years'], errors='coerce').isin([int(y) for y in years])
+        df = df[keep].reset_index(drop=True)
+    return df
+
+
+# ============================================================================
+# INTERNAL HELPERS
+# ============================================================================
+def _check_id_headers(header):
+    found = [str(h).strip() if h is not None else None for h in header[:len(ID_HEADERS)]]
+    if found != ID_HEADERS:
+        raise ValueError(f"Expected identifier columns {ID_HEADERS}, found {found}")
+
+
+def _normalize_label(label):
+    if label is None:
+        return None
+    label = str(label).strip().strip('()').strip()
+    return label.replace('–', '-').lower()
+
+
+def _slug(title):
+    title = title.replace('%', 'pct').replace('+', 'plus')
+    return re.sub(r'[^0-9a-z]+', '_', title.lower()).strip('_')
+
+
+def _parse_disaggregation(title):
+    lowered = title.lower()
+    if 'women' in lowered:
+        sex = 'women'
+    elif re.search(r'\bmen\b', lowered):
+        sex = 'men'
+    else:
+        sex = 'all'
+
+    match = re.search(r'\((\d+)\s*[-–]\s*(\d+)\)|\((\d+)\+\)', title)
+    if match and match.group(3):
+        age = f"{match.group(3)}+"
+    elif match:
+        age = f"{match.group(1)}-{match.group(2)}"
+    else:
+        age = 'all'
+    return sex, age
@@ -0,0 +1,290 @@
+# ============================================================================
+# LIBRARY IMPORTS
+# ============================================================================
+import inspect
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from hiv_charts.aggregates import dataset_version
+from hiv_charts.batch import RENDERERS
+from hiv_charts.cache import WORKBOOK_PATH
+from hiv_charts.profiles import OUTPUT_PROFILES
+from hiv_charts.data import load_yearly_data
+from hiv_charts.index import get_country_index
+from hiv_charts.parallel import _init_worker, _render_worker_bytes, write_shared_dataset
+from hiv_charts.schema import resolve_catalog
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Rendered figures kept in memory (least recently used are evicted first)
+FIGURE_CACHE_SIZE = 128
+
+# Response content type of each output format
+FORMATS = {
+    'png': 'image/png',
+    'webp': 'image/webp',
+    'svg': 'image/svg+xml',
+    'pdf': 'application/pdf',
+    'html': 'text/html; charset=utf-8',
+}
+
+# Output profile used for each format unless ?profile= asks for another one
+# with the same format (e.g. ?profile=print for a 300-dpi PNG)
+DEFAULT_PROFILES = {
+    'png': 'web',
+    'webp': 'webp',
+    'svg': 'svg',
+    'pdf': 'pdf',
+    'html': None,
+}
+
+# Charts that can be returned as interactive HTML
+HTML_CHARTS = ('world-map',)
+
+# Query parameter -> (renderer keyword, parser)
+QUERY_PARAMETERS = {
+    'year': ('target_year', int),
+    'country': ('country', str),
+    'countries': ('countries', lambda value: [c.strip() for c in value.split(',') if c.strip()]),
+    'indicator': ('indicator_column', str),
+    'top_n': ('top_n', int),
+}
+
+
+class ChartRequestError(Exception):
+    """
+    Invalid chart request; status is the HTTP status to answer with.
+    """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# ============================================================================
+# CLASS: CHART SERVICE
+# ============================================================================
+class ChartService:
+    """
+    Keeps the yearly dataset resident and renders charts on request.
+
+    Figures are rendered by a process pool whose workers memory-map the
+    dataset once, and kept in an LRU cache keyed on the chart, its
+    parameters, the output format and profile, and the dataset version. Identical requests that
+    arrive while a figure is being rendered wait for that same render. The
+    workbook is reloaded when its mtime or size changes.
+    """
+
+    def __init__(self, file_path=WORKBOOK_PATH, workers=None, cache_size=FIGURE_CACHE_SIZE):
+        self.file_path = file_path
+        self.workers = workers or os.cpu_count() or 1
+        self.cache_size = cache_size
+
+        self._lock = threading.Lock()
+        self._figures = OrderedDict()
+        self._pending = {}
+        self._executor = None
+        self._dataset_path = None
+        self._stat = None
+        self._load()
+
+    # ------------------------------------------------------------------------
+    # Dataset
+    # ------------------------------------------------------------------------
+    def _load(self):
+        stat = os.stat(self.file_path)
+        df_years = load_yearly_data(self.file_path)
+        dataset_path = write_shared_dataset(df_years)
+        executor = ProcessPoolExecutor(max_workers=self.workers,
+                                       initializer=_init_worker,
+                                       initargs=(dataset_path,))
+
+        old_executor, old_path = self._executor, self._dataset_path
+        self.df_years = df_years
+        self.indicators = set(resolve_catalog(self.file_path, sheet_name=1).names())
+        self.version = dataset_version(df_years)
+        self._executor, self._dataset_path = executor, dataset_path
+        self._stat = (stat.st_mtime_ns, stat.st_size)
+
+        # Workers of the old pool have the file mapped; removing it is safe
+        if old_executor is not None:
+            old_executor.shutdown(wait=False)
+            os.remove(old_path)
+
+    def _refresh(self):
+        stat = os.stat(self.file_path)
+        if (stat.st_mtime_ns, stat.st_size) != self._stat:
+            self._load()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            os.remove(self._dataset_path)
+            self._executor = None
+
+    # ------------------------------------------------------------------------
+    # Rendering
+    # ------------------------------------------------------------------------
+    def job(self, name, query):
+        """
+        Turns a chart name and its query parameters into a render job,
+        validating them against the renderer and the dataset.
+        """
+        if name not in RENDERERS:
+            raise ChartRequestError(404, f"Unknown chart '{name}'. Choose from: {', '.join(RENDERERS)}")
+        renderer, _ = RENDERERS[name]
+        accepted = inspect.signature(renderer).parameters
+
+        kwargs = {}
+        for key, value in query.items():
+            if key not in QUERY_PARAMETERS or QUERY_PARAMETERS[key][0] not in accepted:
+                raise ChartRequestError(400, f"Chart '{name}' does not take parameter '{key}'")
+            keyword, parse = QUERY_PARAMETERS[key]
+            try:
+                kwargs[keyword] = parse(value)
+            except ValueError:
+                raise ChartRequestError(400, f"Invalid value for '{key}': {value!r}") from None
+
+        # '?countries=,' parses to an empty list, which no chart can draw
+        if 'countries' in kwargs and not kwargs['countries']:
+            raise ChartRequestError(400, "Parameter 'countries' needs at least one country")
+        index = get_country_index(self.df_years)
+        for country in [kwargs.get('country')] + kwargs.get('countries', []):
+            if country is not None and country not in index:
+                raise ChartRequestError(404, f"Unknown country '{country}'")
+        if 'target_year' in kwargs and not (self.df_years['Years'] == kwargs['target_year']).any():
+            raise ChartRequestError(404, f"No data for year {kwargs['target_year']}")
+        # Catalog names only: identifier columns such as Country are not indicators
+        if 'indicator_column' in kwargs and kwargs['indicator_column'] not in self.indicators:
+            raise ChartRequestError(400, f"Unknown indicator '{kwargs['indicator_column']}'")
+        return name, kwargs
+
+    def render(self, name, query, image_format='png'):
+        """
+        Returns (bytes, content type, cache hit) for one chart request.
+        """
+        if image_format not in FORMATS or (image_format == 'html' and name not in HTML_CHARTS):
+            raise ChartRequestError(400, f"Chart '{name}' is not available as {image_format}")
+
+        query = dict(query)
+        profile = query.pop('profile', DEFAULT_PROFILES[image_format])
+        if profile is not None and (profile not in OUTPUT_PROFILES
+                                    or OUTPUT_PROFILES[profile].format != image_format):
+            raise ChartRequestError(400, f"Profile '{profile}' does not produce {image_format}")
+
+        with self._lock:
+            self._refresh()
+            job = self.job(name, query)
+            key = (self.version, name, json.dumps(job[1], sort_keys=True), image_format, profile)
+
+            content = self._figures.get(key)
+            if content is not None:
+                self._figures.move_to_end(key)
+                return content, FORMATS[image_format], True
+
+            future = self._pending.get(key)
+            if future is None:
+                future = self._executor.submit(_render_worker_bytes, job, profile)
+                self._pending[key] = future
+
+        try:
+            content = future.result()
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+        with self._lock:
+            self._figures[key] = content
+            while len(self._figures) > self.cache_size:
+                self._figures.popitem(last=False)
+        return content, FORMATS[image_format], False
+
+    def status(self):
+        with self._lock:
+            return {
+                'workbook': self.file_path,
+                'version': self.version,
+                'workers': self.workers,
+                'cached_figures': len(self._figures),
+                'charts': {
+                    name: sorted(key for key, (keyword, _) in QUERY_PARAMETERS.items()
+                                 if keyword in inspect.signature(renderer).parameters)
+                    for name, (renderer, _) in RENDERERS.items()
+                },
+            }
+
+
+# ============================================================================
+# CLASS: HTTP HANDLER
+# ============================================================================
+class ChartRequestHandler(BaseHTTPRequestHandler):
+    """
+    GET /                         service status and chart parameters (JSON)
+    GET /charts/<name>.<format>   one chart, e.g. /charts/heatmap.png?country=Peru
+                                  (web-size PNG; add &profile=print for 300 dpi)
+    """
+
+    service = None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path in ('/', '/status'):
+            self._send(200, json.dumps(self.service.status(), indent=1).encode('utf-8'),
+                       'application/json')
+            return
+
+        if not url.path.startswith('/charts/'):
+            self._send_error(404, f"Unknown path '{url.path}'")
+            return
+
+        name, _, image_format = url.path[len('/charts/'):].partition('.')
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            content, content_type, hit = self.service.render(name, query, image_format or 'png')
+        except ChartRequestError as exc:
+            self._send_error(exc.status, str(exc))
+            return
+        except Exception as exc:
+            self._send_error(500, f"Rendering failed: {exc}")
+            return
+        self._send(200, content, content_type, {'X-Cache': 'hit' if hit else 'miss'})
+
+    def _send(self, status, content, content_type, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _send_error(self, status, message):
+        self._send(status, json.dumps({'error': message}).encode('utf-8'), 'application/json')
+
+
+# ============================================================================
+# FUNCTION: RUN THE SERVICE
+# ============================================================================
+def serve(file_path=WORKBOOK_PATH, host='127.0.0.1', port=8050, workers=None,
+          cache_size=FIGURE_CACHE_SIZE):
+    """
+    Serves charts over HTTP until interrupted.
+    """
+    service = ChartService(file_path, workers=workers, cache_size=cache_size)
+    handler = type('Handler', (ChartRequestHandler,), {'service': service})
+    httpd = ThreadingHTTPServer((host, port), handler)
+    print(f"Serving charts for {file_path} on http://{host}:{port}/")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        service.close()
@@ -0,0 +1,101 @@
+# ============================================================================
+# LIBRARY IMPORTS
+# ============================================================================
+import openpyxl
+import pyarrow as pa
+
+from hiv_charts.cache import WORKBOOK_PATH
+from hiv_charts.trace import traced
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Rows accumulated before a batch is handed to the caller
+DEFAULT_BATCH_SIZE = 2048
+
+# Positions of the identifier columns in every sheet
+YEAR_POSITION = 0
+COUNTRY_POSITION = 2
+
+
+# ============================================================================
+# FUNCTION: STREAM FILTERED ROW BATCHES
+# ============================================================================
+def iter_row_batches(file_path=WORKBOOK_PATH, sheet_name=1, positions=None, names=None,
+                     header_rows=1, countries=None, years=None,
+                     batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Streams a sheet with openpyxl in read-only mode and yields Arrow record
+    batches of the rows that pass the country/year predicates.
+
+    positions selects the columns to keep (default: all) and names gives
+    their output names (default: 'col_<position>'). Identifier columns keep
+    their cell types; every other cell is stored as text, as in the sheet
+    cache. Only one batch is held in memory at a time.
+    """
+    countries = set(countries) if countries is not None else None
+    years = {int(y) for y in years} if years is not None else None
+
+    wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[sheet_name] if isinstance(sheet_name, int) else wb[sheet_name]
+        if positions is None:
+            positions = list(range(ws.max_column))
+        if names is None:
+            names = [f'col_{p}' for p in positions]
+
+        columns = [[] for _ in positions]
+        for row in ws.iter_rows(min_row=header_rows + 1, values_only=True):
+            if len(row) <= COUNTRY_POSITION or row[COUNTRY_POSITION] is None:
+                continue
+            if countries is not None and row[COUNTRY_POSITION] not in countries:
+                continue
+            if years is not None and _as_year(row[YEAR_POSITION]) not in years:
+                continue
+
+            for values, position in zip(columns, positions):
+                values.append(row[position] if position < len(row) else None)
+
+            if len(columns[0]) >= batch_size:
+                yield _to_batch(columns, positions, names)
+                columns = [[] for _ in positions]
+
+        if columns and columns[0]:
+            yield _to_batch(columns, positions, names)
+    finally:
+        wb.close()
+
+
+@traced('load.stream')
+def stream_table(file_path=WORKBOOK_PATH, sheet_name=1, positions=None, names=None,
+                 header_rows=1, countries=None, years=None,
+                 batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Collects the filtered batches of iter_row_batches into one Arrow table.
+    """
+    batches = list(iter_row_batches(file_path, sheet_name, positions, names, header_rows,
+                                    countries, years, batch_size))
+    if not batches:
+        return pa.table({name: pa.array([], type=pa.string()) for name in names or []})
+    return pa.Table.from_batches(batches)
+
+
+# ============================================================================
+# INTERNAL HELPERS
+# ============================================================================
+def _as_year(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_batch(columns, positions, names):
+    arrays = []
+    for values, position in zip(columns, positions):
+        if position == YEAR_POSITION:
+            arrays.append(pa.array([_as_year(v) for v in values], type=pa.int64()))
+        else:
+            arrays.append(pa.array([None if v is None else str(v) for v in values], type=pa.string()))
+    return pa.RecordBatch.from_arrays(arrays, names=names)
@@ -0,0 +1,251 @@
+# ============================================================================
+# LIBRARY IMPORTS
+# ============================================================================
+import atexit
+import functools
+import json
+import logging
+import multiprocessing
+import multiprocessing.util
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# HIV_CHARTS_TRACE=1 (or 'all') records wall time, CPU time, tracemalloc peak
+# and row/column counts per stage; 'time' skips tracemalloc, which slows
+# allocation-heavy code. Unset or '0' disables tracing. CPU time is the
+# stage's own thread; the tracemalloc peak is process-wide, so it is only
+# sampled for stages on the main thread (writer threads report no peak).
+TRACE_ENV = 'HIV_CHARTS_TRACE'
+
+# Chrome-trace JSON written at exit when tracing is on (open it in
+# chrome://tracing or ui.perfetto.dev). Worker processes add '.<pid>'.
+TRACE_FILE_ENV = 'HIV_CHARTS_TRACE_FILE'
+DEFAULT_TRACE_FILE = 'hiv_charts_trace.json'
+
+logger = logging.getLogger('hiv_charts.trace')
+
+_enabled = False
+_memory = False
+_events = []
+_trace_file = None
+_local = threading.local()
+_start_ns = time.perf_counter_ns()
+
+
+# ============================================================================
+# FUNCTION: SWITCH TRACING ON AND OFF
+# ============================================================================
+def enable(memory=True, trace_file=None):
+    """
+    Turns tracing on for this process. trace_file, when given, receives
+    the Chrome trace at exit.
+    """
+    global _enabled, _memory, _trace_file
+    _enabled = True
+    _memory = memory
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+    if trace_file is not None:
+        _trace_file = trace_file
+        _register_export()
+
+
+def disable():
+    global _enabled
+    _enabled = False
+    if _memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def is_enabled():
+    return _enabled
+
+
+def _enable_from_environment():
+    mode = os.environ.get(TRACE_ENV, '').strip().lower()
+    if mode in ('', '0', 'false', 'off'):
+        return
+    enable(memory=mode != 'time', trace_file=os.environ.get(TRACE_FILE_ENV, DEFAULT_TRACE_FILE))
+
+
+def _register_export():
+    # Pool workers register through _after_fork instead: multiprocessing
+    # clears finalizers when a worker starts and workers skip atexit
+    if multiprocessing.current_process().name == 'MainProcess':
+        atexit.register(write_trace, _trace_file)
+
+
+def _after_fork(_module):
+    # Each worker drops the events copied from its parent and writes its own file
+    if _enabled and _trace_file is not None:
+        _events.clear()
+        multiprocessing.util.Finalize(None, write_trace, args=(f"{_trace_file}.{os.getpid()}",),
+                                      exitpriority=0)
+
+
+# ============================================================================
+# CLASS: STAGE
+# ============================================================================
+class _Stage:
+    """
+    One timed stage. Use record(obj) to attach the row/column counts of a
+    DataFrame or array produced inside the block.
+    """
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = dict(args)
+        self.child_peak = 0
+
+    def record(self, obj):
+        shape = _shape_of(obj)
+        if shape is not None:
+            self.args['rows'] = int(shape[0])
+            if len(shape) > 1:
+                self.args['columns'] = int(shape[1])
+        return obj
+
+    def __enter__(self):
+        stack = _stack()
+        # reset_peak is process-wide: a stage on another thread would clear
+        # the peak of the main thread's open stages
+        self._memory = _memory and threading.current_thread() is threading.main_thread()
+        if self._memory:
+            if stack:
+                # reset_peak below drops the parent's peak so far; keep it
+                stack[-1].child_peak = max(stack[-1].child_peak, tracemalloc.get_traced_memory()[1])
+            self._base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        stack.append(self)
+        self._cpu = time.thread_time_ns()
+        self._wall = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter_ns() - self._wall
+        cpu = time.thread_time_ns() - self._cpu
+        stack = _stack()
+        stack.pop()
+
+        fields = {'wall_ms': round(wall / 1e6, 3), 'cpu_ms': round(cpu / 1e6, 3)}
+        if self._memory:
+            peak = max(tracemalloc.get_traced_memory()[1], self.child_peak)
+            fields['peak_bytes'] = peak - self._base
+            if stack:
+                stack[-1].child_peak = max(stack[-1].child_peak, peak)
+        if exc_type is not None:
+            fields['error'] = exc_type.__name__
+        fields.update(self.args)
+
+        _events.append({
+            'name': self.name,
+            'cat': self.name.split('.')[0],
+            'ph': 'X',
+            'ts': (self._wall - _start_ns) / 1e3,
+            'dur': wall / 1e3,
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+            'args': fields,
+        })
+        logger.info(json.dumps({'stage': self.name, **fields}, default=str))
+        return False
+
+
+class _NullStage:
+    def record(self, obj):
+        return obj
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+# ============================================================================
+# FUNCTION: INSTRUMENTATION POINTS
+# ============================================================================
+def stage(name, **args):
+    """
+    Context manager timing one pipeline stage, e.g.
+
+        with stage('save.png', path=png_path) as st:
+            ...
+
+    Returns a shared no-op context when tracing is off.
+    """
+    if not _enabled:
+        return _NULL_STAGE
+    return _Stage(name, args)
+
+
+def traced(name):
+    """
+    Decorator running a function inside stage(name) and recording the
+    row/column counts of its result. Costs one flag check when off.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Stage(name, {}) as st:
+                return st.record(func(*args, **kwargs))
+        return wrapper
+    return decorator
+
+
+# ============================================================================
+# FUNCTION: TRACE EXPORT
+# ============================================================================
+def write_trace(path):
+    """
+    Writes the recorded stages of this process as a Chrome trace.
+    """
+    if not _events:
+        return
+    with open(path, 'w', encoding='utf-8') as fh:
+        json.dump({'traceEvents': _events, 'displayTimeUnit': 'ms'}, fh, default=str)
+
+
+def events():
+    return list(_events)
+
+
+# ============================================================================
+# INTERNAL HELPERS
+# ============================================================================
+def _stack():
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def _shape_of(obj):
+    shape = getattr(obj, 'shape', None)
+    if shape is None:
+        # IndicatorCube and similar records carry their array in .values
+        shape = getattr(getattr(obj, 'values', None), 'shape', None)
+    if isinstance(shape, tuple) and shape:
+        return shape
+    return None
+
+
+_enable_from_environment()
+multiprocessing.util.register_after_fork(sys.modules[__name__], _after_fork)
@@ -0,0 +1,36 @@
+import hashlib
+
+import pandas as pd
+
+from hiv_charts.batch import plan_jobs, render_all
+
+
+def _frame():
+    countries = {'Brazil': 'BRA', 'Chile': 'CHL', 'Colombia': 'COL', 'Peru': 'PER'}
+    rows = [(year, code, country, float(100 * (i + 1) + year - 2020))
+            for i, (country, code) in enumerate(countries.items()) for year in (2022, 2023, 2024)]
+    return pd.DataFrame(rows, columns=['Years', 'Code', 'Country', 'suppressed_all_ages'])
+
+
+def _md5(path):
+    with open(path, 'rb') as fh:
+        return hashlib.md5(fh.read()).hexdigest()
+
+
+def test_incremental_redraws_charts_overwritten_by_another_selection(tmp_path):
+    df_years = _frame()
+
+    def build(countries):
+        jobs = plan_jobs(countries=countries, chart_names=['stacked-area'])
+        return render_all(df_years, jobs, output_dir=str(tmp_path), incremental=True)
+
+    first = build(['Colombia', 'Peru'])
+    colombia_peru = {path: _md5(path) for path in first.written}
+    second = build(['Brazil', 'Chile'])
+    assert not set(second.written) & set(colombia_peru)
+    third = build(['Colombia', 'Peru'])
+
+    # Either skipped with its own file intact, or redrawn identically
+    for path, digest in colombia_peru.items():
+        assert _md5(path) == digest
+    assert third.rendered + third.skipped == 1
@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+
+from hiv_charts.dataset import (FLAG_ABOVE, FLAG_BELOW, FLAG_EMPTY, FLAG_INVALID,
+                                FLAG_NOT_AVAILABLE, FLAG_ROUNDED, FLAG_VALUE, parse_cells)
+
+
+def test_parse_cells_flags_markers_and_expands_rounded_values():
+    raw = pd.DataFrame([
+        [1200, '...', '<100'],
+        ['7.7 m', '450 000', None],
+        ['>98', 'n/a', 3.5],
+    ], dtype=object)
+    values, flags = parse_cells(raw)
+
+    assert values.dtype == np.float32 and flags.dtype == np.uint8
+    assert flags.tolist() == [
+        [FLAG_VALUE, FLAG_NOT_AVAILABLE, FLAG_BELOW],
+        [FLAG_ROUNDED, FLAG_ROUNDED, FLAG_EMPTY],
+        [FLAG_ABOVE, FLAG_INVALID, FLAG_VALUE],
+    ]
+    np.testing.assert_array_equal(values[[0, 1, 1, 2], [0, 0, 1, 2]], [1200, 7.7e6, 450000, 3.5])
+    # Markers carry no number
+    assert np.isnan(values[[0, 0, 1, 2, 2], [1, 2, 2, 0, 1]]).all()
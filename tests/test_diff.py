@@ -0,0 +1,29 @@
+import numpy as np
+
+from hiv_charts.dataset import HIVDataset
+from hiv_charts.diff import diff_datasets
+
+
+def _dataset(values):
+    countries = ['Afghanistan', 'Peru', 'Saint Vincent and the Grenadines']
+    values = np.asarray(values, dtype=np.float32).reshape(3, 2, 1)
+    return HIVDataset(countries, ['AFG', 'PER', 'VCT'], [2023, 2024], ['on_art_all_ages'],
+                      values, np.zeros(values.shape, dtype=np.uint8),
+                      np.ones(values.shape[:2], dtype=bool))
+
+
+def test_country_filter_ignores_other_countries():
+    old = _dataset([1, 2, 3, 4, 5, 6])
+    new = _dataset([1, 2, 3, 4, 50, 60])
+
+    assert len(diff_datasets(old, new, countries=['Afghanistan']).changes) == 0
+    assert len(diff_datasets(old, new, countries=['Peru']).changes) == 0
+
+    changes = diff_datasets(old, new, countries=['Saint Vincent and the Grenadines']).changes
+    assert list(changes['Country']) == ['Saint Vincent and the Grenadines'] * 2
+    assert list(changes['new']) == [50, 60]
+
+
+def test_unfiltered_diff_reports_revisions():
+    changes = diff_datasets(_dataset([1, 2, 3, 4, 5, 6]), _dataset([1, 2, 3, 40, 5, 6])).changes
+    assert list(zip(changes['Code'], changes['Years'], changes['kind'])) == [('PER', 2024, 'revised')]
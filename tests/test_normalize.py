@@ -0,0 +1,20 @@
+import numpy as np
+import pytest
+
+from hiv_charts.normalize import normalize
+
+
+def test_zscore_matches_standard_scaler():
+    preprocessing = pytest.importorskip('sklearn.preprocessing')
+    values = np.random.default_rng(0).normal(50, 10, size=(15, 6))
+
+    np.testing.assert_allclose(normalize(values, 'zscore'),
+                               preprocessing.StandardScaler().fit_transform(values))
+
+
+def test_zscore_centers_constant_columns_without_scaling():
+    values = np.array([[5.0, 1.0], [5.0, 2.0], [5.0, 3.0]])
+    scaled = normalize(values, 'zscore')
+
+    np.testing.assert_array_equal(scaled[:, 0], [0.0, 0.0, 0.0])
+    np.testing.assert_allclose(scaled[:, 1], [-1.224745, 0.0, 1.224745], rtol=1e-6)
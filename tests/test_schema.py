@@ -0,0 +1,35 @@
+import pytest
+
+from hiv_charts import schema
+from hiv_charts.schema import resolve_catalog
+
+AGES = ['(All ages)', '(Children, ages 0–14)', '(Adults, ages 15+)', '(Women, ages 15+)', '(Men, ages 15+)']
+HEADER = ['Years', 'Code', 'Country'] + AGES * 8 + [None, 'Effective regimen', 'Effective regimen']
+
+
+def _catalog(monkeypatch, header):
+    monkeypatch.setattr(schema, 'read_header_rows', lambda *args, **kwargs: [header])
+    return resolve_catalog('workbook.xlsx', sheet_name=1)
+
+
+def test_columns_resolve_by_label_not_position(monkeypatch):
+    # The last block lists men before women, as some releases do
+    header = HEADER[:-8] + ['(All ages)', '(Children, ages 0–14)', '(Men, ages 15+)',
+                            '(Women, ages 15+)', '(Adults, ages 15+)'] + HEADER[-3:]
+    catalog = _catalog(monkeypatch, header)
+
+    assert len(catalog) == 43
+    assert catalog['know_status_pct_all_ages'].position == 3
+    assert catalog['suppressed_men_15plus'].position == 40
+    assert catalog['suppressed_women_15plus'].position == 41
+    assert catalog['pmtct_coverage_pct'].position == 45
+
+
+@pytest.mark.parametrize('header', [
+    HEADER[:3] + ['Region'] + HEADER[3:],
+    HEADER[:10] + HEADER[11:],
+    HEADER[:3] + AGES * 7 + HEADER[-3:],
+])
+def test_shifted_layout_raises(monkeypatch, header):
+    with pytest.raises(ValueError):
+        _catalog(monkeypatch, header)